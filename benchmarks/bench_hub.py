@@ -0,0 +1,156 @@
+"""End-to-end benchmark against a simulated TuneBlade hub on localhost.
+
+Reports poll latency (p50/p99) of TuneBladeApiClient, command throughput
+through the per-device queues, listener callbacks (state writes) per
+coordinator poll, and how long commands wait while slow polls keep every
+connection busy. Needs aiohttp and homeassistant, but no network access.
+
+    python benchmarks/bench_hub.py --devices 40 --latency 0.01 --churn 2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import ClientSession
+
+from fake_hub import FakeHub
+from harness import percentile, running_hass
+
+from custom_components.tuneblade.coordinator import TuneBladeDataUpdateCoordinator
+from custom_components.tuneblade.tuneblade import POOL_SIZE, TuneBladeApiClient, TuneBladeError
+
+SLOW_POLLING = {"fast_interval": 3600, "scan_interval": 3600, "idle_interval": 3600}
+
+
+async def bench_poll_latency(client: TuneBladeApiClient, polls: int) -> dict:
+    samples = []
+    errors = 0
+    for _ in range(polls):
+        start = time.perf_counter()
+        try:
+            await client.async_get_data()
+        except TuneBladeError:
+            errors += 1
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": percentile(samples, 50), "p99_ms": percentile(samples, 99), "errors": errors}
+
+
+async def bench_commands(client: TuneBladeApiClient, hub: FakeHub, rounds: int) -> dict:
+    device_ids = list(hub.devices)
+    before = hub.command_requests
+    calls = 0
+    start = time.perf_counter()
+    for step in range(rounds):
+        pending = []
+        for device_id in device_ids:
+            pending.append(client.connect(device_id))
+            pending.append(client.set_volume(device_id, step % 101))
+            calls += 2
+        await asyncio.gather(*pending, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    sent = hub.command_requests - before
+    return {
+        "calls_per_s": calls / elapsed,
+        "hub_requests_per_s": sent / elapsed,
+        "coalesced_pct": 100 * (1 - sent / calls) if calls else 0.0,
+    }
+
+
+async def bench_priority(client: TuneBladeApiClient, hub: FakeHub, commands: int, poll_latency: float) -> dict:
+    """Send commands while enough slow polls run to occupy the whole pool."""
+    hub.poll_latency = poll_latency
+    stop = asyncio.Event()
+
+    async def _poller():
+        while not stop.is_set():
+            try:
+                await client.async_get_data()
+            except TuneBladeError:
+                pass
+
+    pollers = [asyncio.create_task(_poller()) for _ in range(POOL_SIZE * 2)]
+    await asyncio.sleep(poll_latency / 2)
+    preempted = client.stats.polls_preempted
+    device_ids = list(hub.devices)
+    samples = []
+    for step in range(commands):
+        start = time.perf_counter()
+        await client.set_volume(device_ids[step % len(device_ids)], step % 101)
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(poll_latency / 4)
+    stop.set()
+    await asyncio.gather(*pollers)
+    hub.poll_latency = 0.0
+    return {
+        "command_p50_ms": percentile(samples, 50),
+        "command_p99_ms": percentile(samples, 99),
+        "wait_p99_ms": client.stats.command_wait.percentile(99) or 0.0,
+        "poll_ms": poll_latency * 1000,
+        "polls_preempted": client.stats.polls_preempted - preempted,
+    }
+
+
+async def bench_state_writes(hass, client: TuneBladeApiClient, hub: FakeHub, polls: int) -> dict:
+    coordinator = TuneBladeDataUpdateCoordinator(hass, client, config_entry=None)
+    coordinator.async_configure_polling(SLOW_POLLING)
+    await coordinator.async_refresh()
+
+    writes = 0
+
+    def _write():
+        nonlocal writes
+        writes += 1
+
+    removers = [coordinator.async_add_listener(_write, device_id) for device_id in coordinator.data]
+    for _ in range(polls):
+        await coordinator.async_refresh()
+    for remove in removers:
+        remove()
+    await coordinator.async_shutdown()
+    return {"writes_per_poll": writes / polls, "entities": len(removers)}
+
+
+async def main(options: argparse.Namespace) -> None:
+    hub = FakeHub(
+        devices=options.devices,
+        latency=options.latency,
+        failure_rate=options.failure_rate,
+        churn=options.churn,
+        seed=1,
+    )
+    port = await hub.start()
+    try:
+        async with running_hass() as hass, ClientSession() as session:
+            client = TuneBladeApiClient("127.0.0.1", port, session)
+            results = {
+                "poll": await bench_poll_latency(client, options.polls),
+                "commands": await bench_commands(client, hub, options.rounds),
+                "dispatch": await bench_state_writes(hass, client, hub, options.polls),
+                "priority": await bench_priority(client, hub, options.commands, options.poll_latency),
+            }
+            client.cancel_commands()
+    finally:
+        await hub.stop()
+
+    print(
+        f"devices={options.devices} latency={options.latency * 1000:.0f}ms "
+        f"churn={options.churn} failure_rate={options.failure_rate}"
+    )
+    for section, values in results.items():
+        formatted = " ".join(f"{key}={value:.2f}" for key, value in values.items())
+        print(f"  {section:<9} {formatted}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--churn", type=int, default=2, help="devices whose volume changes per poll")
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20, help="command rounds across all devices")
+    parser.add_argument("--commands", type=int, default=50, help="commands sent during slow polls")
+    parser.add_argument("--poll-latency", type=float, default=0.5, help="status delay for the priority run")
+    asyncio.run(main(parser.parse_args()))
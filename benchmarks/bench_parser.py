@@ -0,0 +1,122 @@
+"""Micro-benchmark for the ``/v2`` status parser.
+
+Compares the original text/split/dict parsing with ``StatusParser`` for a
+cold parse, an unchanged body and a body where 10% of the devices changed.
+Reports time per parse and the number and size of allocations.
+
+    python benchmarks/bench_parser.py [--repeat 200]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import pathlib
+import timeit
+import tracemalloc
+
+PARSER_PATH = pathlib.Path(__file__).resolve().parents[1] / "custom_components" / "tuneblade" / "parser.py"
+
+
+def load_parser():
+    """Import parser.py directly so Home Assistant does not need to be installed."""
+    spec = importlib.util.spec_from_file_location("tuneblade_parser", PARSER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_body(count: int, changed: int = 0) -> bytes:
+    """Build a status body with ``count`` devices, the first ``changed`` with a new volume."""
+    lines = []
+    for index in range(count):
+        volume = 50 if index >= changed else 51
+        status = 100 if index % 3 == 0 else 0
+        lines.append(f"{index:012X} {status} {volume} Living Room Speaker {index}")
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+def legacy_parse(body: bytes) -> dict:
+    """The parsing TuneBladeApiClient.async_get_data used before StatusParser."""
+    raw_text = body.decode()
+    devices = {}
+    for line in raw_text.strip().splitlines():
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        device_id = parts[0]
+        connected_flag = parts[1]
+        name = " ".join(parts[3:]) if len(parts) > 3 else device_id
+        try:
+            connected = int(connected_flag) != 0
+        except ValueError:
+            connected = False
+        try:
+            volume = int(parts[2])
+        except ValueError:
+            volume = None
+        devices[device_id] = {
+            "id": device_id,
+            "name": name.strip(),
+            "connected": connected,
+            "volume": volume,
+            "status_code": connected_flag,
+        }
+    return devices
+
+
+def measure(func, repeat: int) -> tuple[float, int, int]:
+    """Return (microseconds per call, allocated blocks, allocated bytes) for one call."""
+    seconds = min(timeit.repeat(func, number=repeat, repeat=3)) / repeat
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    del result
+    return seconds * 1e6, blocks, size
+
+
+def main() -> None:
+    parser_module = load_parser()
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument("--repeat", type=int, default=200)
+    options = args.parse_args()
+
+    print(f"{'devices':>8} {'case':<22} {'us/parse':>10} {'blocks':>8} {'bytes':>10}")
+    for count in (10, 100, 1000):
+        body = make_body(count)
+        changed_body = make_body(count, changed=max(1, count // 10))
+
+        def status_cold(body=body):
+            return parser_module.StatusParser().parse(body)
+
+        warm = parser_module.StatusParser()
+        warm.parse(body)
+
+        def status_unchanged(warm=warm, body=body):
+            return warm.parse(body)
+
+        flip = parser_module.StatusParser()
+        bodies = [body, changed_body]
+        state = {"index": 0}
+
+        def status_changed(flip=flip, bodies=bodies, state=state):
+            state["index"] ^= 1
+            return flip.parse(bodies[state["index"]])
+
+        cases = (
+            ("legacy", lambda body=body: legacy_parse(body)),
+            ("StatusParser cold", status_cold),
+            ("StatusParser unchanged", status_unchanged),
+            ("StatusParser 10% moved", status_changed),
+        )
+        for name, func in cases:
+            micros, blocks, size = measure(func, options.repeat)
+            print(f"{count:>8} {name:<22} {micros:>10.1f} {blocks:>8} {size:>10}")
+
+
+if __name__ == "__main__":
+    main()
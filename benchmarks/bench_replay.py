@@ -0,0 +1,136 @@
+"""Replay a recorded TuneBlade trace through the coordinator.
+
+Feeds every recorded ``/v2`` response to a coordinator whose listeners
+write entity states the way the integration's media players do, and
+reports parse, dispatch and state-write throughput. Record a trace with the
+``tuneblade.record`` service, or make one from the fake hub:
+
+    python benchmarks/bench_replay.py --record-fake 2000 --devices 40 --churn 2
+    python benchmarks/bench_replay.py tuneblade_trace_living_room_20250101_120000.tbt
+    python benchmarks/bench_replay.py trace.tbt --realtime --speed 10
+
+Needs aiohttp and homeassistant, but no network access.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fake_hub import FakeHub
+from harness import running_hass
+
+from custom_components.tuneblade.coordinator import TuneBladeDataUpdateCoordinator
+from custom_components.tuneblade.recording import RECORD_COMMAND, TraceRecorder, read_trace
+from custom_components.tuneblade.replay import ReplayApiClient
+from custom_components.tuneblade.tuneblade import TuneBladeApiClient
+
+SLOW_POLLING = {"fast_interval": 3600, "scan_interval": 3600, "idle_interval": 3600}
+
+
+async def record_fake(path: str, polls: int, options: argparse.Namespace) -> None:
+    """Record a trace of polls against the fake hub."""
+    hub = FakeHub(devices=options.devices, churn=options.churn, guests=options.guests, seed=1)
+    port = await hub.start()
+    client = TuneBladeApiClient("127.0.0.1", port)
+    client.recorder = TraceRecorder(path)
+    try:
+        for _ in range(polls):
+            await client.async_get_data()
+    finally:
+        await client.async_close()
+        await hub.stop()
+
+
+async def replay(hass, events, options: argparse.Namespace) -> dict:
+    client = ReplayApiClient(events, realtime=options.realtime, speed=options.speed)
+    client.stats.spans_enabled = True
+    coordinator = TuneBladeDataUpdateCoordinator(hass, client, config_entry=None)
+    coordinator.async_configure_polling(SLOW_POLLING)
+
+    writes = 0
+    removers = {}
+
+    def _writer(device_id: str):
+        entity_id = f"media_player.replay_{device_id.lower()}"
+
+        def _write():
+            nonlocal writes
+            view = coordinator.device_view(device_id)
+            with client.stats.span("state_write"):
+                hass.states.async_set(entity_id, view.state, view.attributes)
+            writes += 1
+
+        return _write
+
+    def _add(device_ids):
+        for device_id in device_ids:
+            removers[device_id] = coordinator.async_add_listener(_writer(device_id), device_id)
+
+    remove_new = coordinator.async_add_new_devices_listener(_add)
+    polls = 0
+    start = time.perf_counter()
+    while not client.exhausted:
+        await coordinator.async_refresh()
+        polls += 1
+    elapsed = time.perf_counter() - start
+
+    remove_new()
+    for remove in removers.values():
+        remove()
+    await coordinator.async_shutdown()
+    await client.async_close()
+
+    stages = client.stats.stages_as_dict()
+    return {
+        "polls": polls,
+        "elapsed_s": elapsed,
+        "polls_per_s": polls / elapsed if elapsed else 0.0,
+        "writes": writes,
+        "writes_per_s": writes / elapsed if elapsed else 0.0,
+        "recorded_commands": client.recorded_commands,
+        "stages": stages,
+    }
+
+
+async def main(options: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as scratch:
+        path = options.trace
+        if options.record_fake:
+            path = os.path.join(scratch, "fake.tbt")
+            await record_fake(path, options.record_fake, options)
+        if path is None:
+            raise SystemExit("Give a trace file or --record-fake N")
+        events = list(read_trace(path))
+
+    async with running_hass() as hass:
+        results = await replay(hass, events, options)
+
+    print(
+        f"events={len(events)} polls={results['polls']} "
+        f"commands_in_trace={sum(1 for event in events if event.kind == RECORD_COMMAND)} "
+        f"mode={'realtime x' + str(options.speed) if options.realtime else 'max speed'}"
+    )
+    print(
+        f"  throughput polls_per_s={results['polls_per_s']:.1f} "
+        f"state_writes_per_s={results['writes_per_s']:.1f} writes={results['writes']}"
+    )
+    for stage, values in results["stages"].items():
+        print(
+            f"  {stage:<12} count={values['count']} p50_ms={values['p50']:.3f} "
+            f"p99_ms={values['p99']:.3f} max_ms={values['max']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", nargs="?", help="trace file written by tuneblade.record")
+    parser.add_argument("--realtime", action="store_true", help="replay at the recorded pace")
+    parser.add_argument("--speed", type=float, default=1.0, help="speed-up factor for --realtime")
+    parser.add_argument("--record-fake", type=int, default=0, metavar="POLLS", help="record a trace from the fake hub first")
+    parser.add_argument("--devices", type=int, default=40)
+    parser.add_argument("--churn", type=int, default=2)
+    parser.add_argument("--guests", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
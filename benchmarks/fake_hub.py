@@ -0,0 +1,179 @@
+"""Simulated TuneBlade hub for offline benchmarks.
+
+Serves the endpoints the integration uses on localhost:
+
+    GET /v2                              status of every device
+    GET /v2/{id}/Status/Connect          connect a device
+    GET /v2/{id}/Status/Disconnect       disconnect a device
+    GET /v2/{id}/Volume/{n}              set a device's volume
+
+Run standalone to point a development Home Assistant at it:
+
+    python benchmarks/fake_hub.py --devices 40 --latency 0.05 --port 54412
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+
+from aiohttp import web
+
+
+class FakeHub:
+    """In-memory hub state plus an aiohttp application serving it."""
+
+    def __init__(
+        self,
+        devices: int = 20,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        churn: int = 0,
+        master: bool = True,
+        seed: int | None = None,
+        guests: int = 0,
+        guest_rate: float = 0.1,
+        poll_latency: float = 0.0,
+    ):
+        self.latency = latency
+        # Extra delay of status requests only, e.g. a hub slow to list many devices
+        self.poll_latency = poll_latency
+        self.failure_rate = failure_rate
+        # Devices whose volume drifts on every status request
+        self.churn = churn
+        # Guest devices come and go: each status request replaces one with a
+        # never-seen device with probability guest_rate
+        self.guest_rate = guest_rate
+        self._guest_ids: list[str] = []
+        self._next_guest = 0
+        self.random = random.Random(seed)
+        self.devices: dict[str, list] = {}
+        if master:
+            self.devices["MASTER"] = [0, 50, "Master"]
+        for index in range(devices):
+            self.devices[f"{index:012X}"] = [0, 50, f"Speaker {index}"]
+        for _ in range(guests):
+            self._add_guest()
+
+        self.status_requests = 0
+        self.command_requests = 0
+        self.failures = 0
+
+        self.app = web.Application()
+        self.app.router.add_get("/v2", self._status)
+        self.app.router.add_get("/v2/{device_id}/Status/{action}", self._set_status)
+        self.app.router.add_get("/v2/{device_id}/Volume/{volume}", self._set_volume)
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving and return the bound port."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        return self.port
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def body(self) -> bytes:
+        """Return the current ``/v2`` body."""
+        return "".join(
+            f"{device_id} {status} {volume} {name}\r\n"
+            for device_id, (status, volume, name) in self.devices.items()
+        ).encode()
+
+    def _add_guest(self) -> None:
+        device_id = f"GUEST{self._next_guest:07X}"
+        self._next_guest += 1
+        self._guest_ids.append(device_id)
+        self.devices[device_id] = [0, 30, f"Guest {self._next_guest}"]
+
+    async def _delay_or_fail(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            self.failures += 1
+            raise web.HTTPInternalServerError()
+
+    def _device(self, request: web.Request) -> list:
+        device = self.devices.get(request.match_info["device_id"])
+        if device is None:
+            raise web.HTTPNotFound()
+        return device
+
+    async def _status(self, request: web.Request) -> web.Response:
+        self.status_requests += 1
+        if self.poll_latency:
+            await asyncio.sleep(self.poll_latency)
+        await self._delay_or_fail()
+        if self.churn:
+            for device_id in self.random.sample(list(self.devices), min(self.churn, len(self.devices))):
+                self.devices[device_id][1] = self.random.randint(0, 100)
+        if self._guest_ids and self.random.random() < self.guest_rate:
+            del self.devices[self._guest_ids.pop(self.random.randrange(len(self._guest_ids)))]
+            self._add_guest()
+        return web.Response(body=self.body(), content_type="text/plain")
+
+    async def _set_status(self, request: web.Request) -> web.Response:
+        self.command_requests += 1
+        await self._delay_or_fail()
+        device = self._device(request)
+        action = request.match_info["action"]
+        if action == "Connect":
+            device[0] = 100
+        elif action == "Disconnect":
+            device[0] = 0
+        else:
+            raise web.HTTPNotFound()
+        return web.Response(text="OK")
+
+    async def _set_volume(self, request: web.Request) -> web.Response:
+        self.command_requests += 1
+        await self._delay_or_fail()
+        device = self._device(request)
+        try:
+            device[1] = max(0, min(100, int(request.match_info["volume"])))
+        except ValueError as err:
+            raise web.HTTPBadRequest() from err
+        return web.Response(text="OK")
+
+
+async def _serve(options: argparse.Namespace) -> None:
+    hub = FakeHub(
+        devices=options.devices,
+        latency=options.latency,
+        failure_rate=options.failure_rate,
+        churn=options.churn,
+        guests=options.guests,
+    )
+    port = await hub.start(options.host, options.port)
+    print(f"Fake TuneBlade hub with {options.devices} devices on http://{options.host}:{port}/v2")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await hub.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54412)
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--churn", type=int, default=0)
+    parser.add_argument("--guests", type=int, default=0, help="guest devices that come and go")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
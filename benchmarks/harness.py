@@ -0,0 +1,52 @@
+"""Shared helpers for the benchmark scripts that need Home Assistant."""
+from __future__ import annotations
+
+import contextlib
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@contextlib.asynccontextmanager
+async def running_hass():
+    """Yield a bare HomeAssistant instance that is enough to drive a coordinator."""
+    from homeassistant.core import HomeAssistant
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            yield hass
+        finally:
+            await hass.async_block_till_done()
+            with contextlib.suppress(Exception):
+                await hass.async_stop(force=True)
+
+
+@contextlib.asynccontextmanager
+async def running_hass_with_integration():
+    """Yield a HomeAssistant instance with registries, config entries and this integration loadable.
+
+    Entries are added through the config flow, so the integration is set up
+    exactly as it would be in a real instance.
+    """
+    from homeassistant import bootstrap, loader
+
+    async with running_hass() as hass:
+        os.symlink(ROOT / "custom_components", pathlib.Path(hass.config.config_dir) / "custom_components")
+        loader.async_setup(hass)
+        await bootstrap.async_from_config_dict({"homeassistant": {}}, hass)
+        await hass.async_block_till_done()
+        yield hass
+
+
+def percentile(samples: list[float], pct: int) -> float:
+    """Return the pct-th percentile of samples (1..99)."""
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
@@ -0,0 +1,185 @@
+"""Soak test: run the integration against a simulated hub and watch for leaks.
+
+Sets up a real config entry through the config flow, drives the hub's
+coordinator through many polls (with volume churn, guest devices coming
+and going and periodic batch commands), then reloads the entry over and
+over. At regular intervals it samples:
+
+- traced Python memory (tracemalloc),
+- coordinator and event bus listeners,
+- pending asyncio tasks,
+- live coordinator and API client objects.
+
+Exits with status 1 if any of them keeps growing after warm-up, and prints
+the allocation sites that grew most. Needs aiohttp and homeassistant, but
+no network access.
+
+    python benchmarks/soak.py --polls 200000 --reloads 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+
+from fake_hub import FakeHub
+from harness import running_hass_with_integration
+
+from custom_components.tuneblade.const import DOMAIN
+from custom_components.tuneblade.coordinator import TuneBladeDataUpdateCoordinator
+from custom_components.tuneblade.tuneblade import ACTION_VOLUME, TuneBladeApiClient
+
+# Polling is driven by the soak loop; keep the entry's own timer out of the way
+SOAK_OPTIONS = {
+    "fast_interval": 3600,
+    "scan_interval": 3600,
+    "idle_interval": 3600,
+    "max_backoff": 3600,
+}
+
+# metric -> (relative tolerance, absolute slack) allowed between the first and
+# second half of the samples taken after warm-up
+LIMITS = {
+    "memory_kib": (0.10, 1024),
+    "coordinator_listeners": (0.0, 0),
+    "bus_listeners": (0.0, 0),
+    "tasks": (0.0, 4),
+    "coordinators": (0.0, 0),
+    "clients": (0.0, 0),
+}
+
+
+def _live(cls: type) -> int:
+    return sum(1 for obj in gc.get_objects() if type(obj) is cls)
+
+
+def sample(hass) -> dict[str, float]:
+    """Collect garbage and measure everything that must stay bounded."""
+    gc.collect()
+    coordinators = hass.data.get(DOMAIN, {}).values()
+    return {
+        "memory_kib": tracemalloc.get_traced_memory()[0] / 1024,
+        "coordinator_listeners": sum(len(coordinator._listeners) for coordinator in coordinators),
+        "bus_listeners": sum(hass.bus.async_listeners().values()),
+        "tasks": len(asyncio.all_tasks()),
+        "coordinators": _live(TuneBladeDataUpdateCoordinator),
+        "clients": _live(TuneBladeApiClient),
+    }
+
+
+def grows(samples: list[float], tolerance: float, slack: float) -> bool:
+    """Return True if the later samples exceed the earlier ones beyond the limits."""
+    steady = samples[len(samples) // 4:]
+    if len(steady) < 4:
+        return False
+    half = len(steady) // 2
+    return max(steady[half:]) > max(steady[:half]) * (1 + tolerance) + slack
+
+
+async def setup_entry(hass, port: int, device_ttl: float):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": "user"},
+        data={"host": "127.0.0.1", "port": port, "name": "Soak"},
+    )
+    entry = result["result"]
+    hass.config_entries.async_update_entry(entry, options={**SOAK_OPTIONS, "device_ttl": device_ttl / 3600})
+    await hass.async_block_till_done()
+    return entry
+
+
+async def soak_polls(hass, entry, polls: int, sample_every: int, samples: list[dict]) -> None:
+    command_every = 97
+    for poll in range(1, polls + 1):
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        await coordinator.async_refresh()
+        if poll % command_every == 0:
+            device_ids = [device_id for device_id in coordinator.data if device_id != "MASTER"][:4]
+            await coordinator.async_run_batch(device_ids, ACTION_VOLUME, poll % 101)
+        if poll % sample_every == 0:
+            await hass.async_block_till_done()
+            samples.append(sample(hass))
+
+
+async def soak_reloads(hass, entry, reloads: int, samples: list[dict]) -> None:
+    for _ in range(reloads):
+        await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        samples.append(sample(hass))
+
+
+def report(phase: str, samples: list[dict]) -> list[str]:
+    failures = []
+    print(f"{phase}: {len(samples)} samples")
+    for metric, (tolerance, slack) in LIMITS.items():
+        values = [values[metric] for values in samples]
+        if not values:
+            continue
+        leaking = grows(values, tolerance, slack)
+        print(
+            f"  {metric:<22} first={values[0]:>10.1f} last={values[-1]:>10.1f} "
+            f"max={max(values):>10.1f} {'GROWING' if leaking else 'ok'}"
+        )
+        if leaking:
+            failures.append(f"{phase}: {metric}")
+    return failures
+
+
+async def main(options: argparse.Namespace) -> int:
+    hub = FakeHub(
+        devices=options.devices,
+        churn=options.churn,
+        guests=options.guests,
+        seed=1,
+    )
+    port = await hub.start()
+    tracemalloc.start(10)
+    start = time.perf_counter()
+    try:
+        async with running_hass_with_integration() as hass:
+            entry = await setup_entry(hass, port, options.device_ttl)
+            poll_samples: list[dict] = []
+            reload_samples: list[dict] = []
+            baseline = tracemalloc.take_snapshot()
+
+            await soak_polls(hass, entry, options.polls, options.sample_every, poll_samples)
+            await soak_reloads(hass, entry, options.reloads, reload_samples)
+
+            final = tracemalloc.take_snapshot()
+            await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        await hub.stop()
+        tracemalloc.stop()
+
+    print(
+        f"devices={options.devices} guests={options.guests} polls={options.polls} "
+        f"reloads={options.reloads} elapsed={time.perf_counter() - start:.0f}s "
+        f"hub_requests={hub.status_requests + hub.command_requests}"
+    )
+    failures = report("polls", poll_samples) + report("reloads", reload_samples)
+
+    print("largest allocation growth:")
+    for stat in final.compare_to(baseline, "lineno")[: options.top]:
+        print(f"  {stat}")
+
+    if failures:
+        print("FAIL: unbounded growth in " + ", ".join(failures))
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=40)
+    parser.add_argument("--churn", type=int, default=2, help="devices whose volume changes per poll")
+    parser.add_argument("--guests", type=int, default=5, help="guest devices that come and go")
+    parser.add_argument("--device-ttl", type=float, default=5.0, help="seconds before a missing device is removed")
+    parser.add_argument("--polls", type=int, default=200_000)
+    parser.add_argument("--reloads", type=int, default=200)
+    parser.add_argument("--sample-every", type=int, default=5_000)
+    parser.add_argument("--top", type=int, default=10, help="allocation sites to print")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,19 +1,30 @@
 import logging
-from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.const import CONF_HOST, CONF_PORT, EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.storage import Store
 
 from .tuneblade import TuneBladeApiClient
-from .coordinator import TuneBladeDataUpdateCoordinator
-from .const import DOMAIN
+from .coordinator import TuneBladeDataUpdateCoordinator, storage_key
+from .const import (
+    CONF_GROUP_DEVICES,
+    CONF_GROUP_ID,
+    CONF_GROUP_NAME,
+    CONF_GROUPS,
+    DOMAIN,
+    DOMAIN_DATA,
+    PLATFORMS,
+    STORAGE_VERSION,
+)
+from .entity import device_identifier, hub_identifier
+from .group import SpeakerGroup
+from .scheduler import TuneBladePollScheduler
+from .services import async_setup_services, async_unload_services
 
 _LOGGER = logging.getLogger(__name__)
-SCAN_INTERVAL = timedelta(seconds=10)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -22,32 +33,136 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
 
-    session = async_create_clientsession(hass)
+    # The client owns a small keep-alive pool dedicated to this hub
+    client = TuneBladeApiClient(host=host, port=port)
 
-    client = TuneBladeApiClient(
-        host=host,
-        port=port,
-        session=session,
-    )
+    coordinator = TuneBladeDataUpdateCoordinator(hass, client, config_entry=entry)
+    coordinator.async_configure_polling(entry.options)
 
-    coordinator = TuneBladeDataUpdateCoordinator(hass, client)
-
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as err:
-        _LOGGER.error("Error connecting to TuneBlade hub: %s", err)
-        raise ConfigEntryNotReady from err
+    if await coordinator.async_load_cache():
+        # Entities come up from the cache as unavailable; the hub is read in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.title}"
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception as err:
+            _LOGGER.error("Error connecting to TuneBlade hub: %s", err)
+            await client.async_close()
+            raise ConfigEntryNotReady from err
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
-    await hass.config_entries.async_forward_entry_setups(entry, ["media_player", "switch"])
+    scheduler = hass.data.get(DOMAIN_DATA)
+    if scheduler is None:
+        scheduler = hass.data[DOMAIN_DATA] = TuneBladePollScheduler(hass)
+    entry.async_on_unload(scheduler.async_register(coordinator))
+
+    for group_config in entry.options.get(CONF_GROUPS, []):
+        group = SpeakerGroup(
+            coordinator,
+            group_config[CONF_GROUP_ID],
+            group_config[CONF_GROUP_NAME],
+            group_config[CONF_GROUP_DEVICES],
+        )
+        coordinator.groups[group.group_id] = group
+        entry.async_on_unload(group.async_start())
+
+    await _async_migrate_unique_ids(hass, entry)
+    coordinator.async_track_registry_devices()
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_setup_services(hass)
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
+
+    async def _async_close_client(event: Event) -> None:
+        await client.async_close()
+
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_client))
 
     return True
 
 
+async def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Scope unique IDs and devices to the config entry so several hubs can coexist."""
+    prefix = f"{entry.entry_id}_"
+
+    @callback
+    def _migrate(entity_entry: er.RegistryEntry) -> dict | None:
+        if entity_entry.unique_id.startswith(prefix):
+            return None
+        return {"new_unique_id": f"{prefix}{entity_entry.unique_id}"}
+
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate)
+
+    device_registry = dr.async_get(hass)
+    legacy_hub = device_registry.async_get_device(identifiers={(DOMAIN, "MASTER")})
+    if legacy_hub is not None and entry.entry_id in legacy_hub.config_entries:
+        device_registry.async_update_device(
+            legacy_hub.id, new_identifiers={hub_identifier(entry.entry_id)}
+        )
+
+    # Speaker devices were shared by every hub reporting the speaker
+    entity_registry = er.async_get(hass)
+    legacy = [
+        (device, device_id)
+        for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id)
+        for domain, device_id in device.identifiers
+        if domain == DOMAIN and not any(device_id.startswith(f"{entry_id}_") for entry_id in device.config_entries)
+    ]
+    for device, device_id in legacy:
+        identifier = device_identifier(entry.entry_id, device_id)
+        if len(device.config_entries) == 1:
+            device_registry.async_update_device(device.id, new_identifiers={identifier})
+            continue
+        # Give this hub its own copy and move its entities there; the last
+        # hub left on the shared device renames it in place
+        own = device_registry.async_get_or_create(
+            config_entry_id=entry.entry_id,
+            identifiers={identifier},
+            via_device=hub_identifier(entry.entry_id),
+            name=device.name,
+            manufacturer=device.manufacturer,
+        )
+        device_registry.async_update_device(own.id, name_by_user=device.name_by_user, area_id=device.area_id)
+        for entity_entry in er.async_entries_for_device(entity_registry, device.id, include_disabled_entities=True):
+            if entity_entry.config_entry_id == entry.entry_id:
+                entity_registry.async_update_entity(entity_entry.entity_id, device_id=own.id)
+        device_registry.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
+
+
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed polling options without reloading the entry.
+
+    Group changes add or remove entities, so those reload the entry.
+    """
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    groups = [
+        (group.group_id, group.name, group.device_ids) for group in coordinator.groups.values()
+    ]
+    configured = [
+        (group[CONF_GROUP_ID], group[CONF_GROUP_NAME], group[CONF_GROUP_DEVICES])
+        for group in entry.options.get(CONF_GROUPS, [])
+    ]
+    if groups != configured:
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
+    coordinator.async_configure_polling(entry.options)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload TuneBlade config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, ["media_player", "switch"])
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.client.async_close()
+        if not hass.data[DOMAIN]:
+            async_unload_services(hass)
+            hass.data.pop(DOMAIN_DATA, None)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the device cache of a removed entry."""
+    await Store(hass, STORAGE_VERSION, storage_key(entry.entry_id)).async_remove()
@@ -0,0 +1,102 @@
+"""Circuit breaker guarding requests to a TuneBlade hub."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Consecutive failed operations before the circuit opens
+FAILURE_THRESHOLD = 3
+# Seconds the circuit stays open before a trial request is let through
+RESET_TIMEOUT = 30.0
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one hub.
+
+    While open every call fails fast. After ``reset_timeout`` a single trial
+    call is allowed (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._listeners: list[Callable[[str], None]] = []
+
+    @property
+    def state(self) -> str:
+        """Return the current state, moving from open to half-open when due."""
+        if self._state == STATE_OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+            self._set_state(STATE_HALF_OPEN)
+        return self._state
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a trial request through."""
+        if self._state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._reset_timeout - self._clock())
+
+    def add_listener(self, listener: Callable[[str], None]) -> Callable[[], None]:
+        """Call listener(new_state) on every transition; returns a remover."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give up a trial request without an outcome, e.g. when it was cancelled."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._trial_in_flight = False
+        if self._state != STATE_CLOSED:
+            _LOGGER.info("TuneBlade hub is reachable again, closing circuit")
+            self._set_state(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._state == STATE_HALF_OPEN or (
+            self._state == STATE_CLOSED and self._failures >= self._failure_threshold
+        ):
+            if self._state == STATE_CLOSED:
+                _LOGGER.warning(
+                    "TuneBlade hub failed %s times in a row, failing fast for %ss",
+                    self._failures,
+                    self._reset_timeout,
+                )
+            self._opened_at = self._clock()
+            self._set_state(STATE_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        if state == self._state:
+            return
+        self._state = state
+        for listener in list(self._listeners):
+            listener(state)
@@ -0,0 +1,123 @@
+"""Per-device command queue for the TuneBlade API client."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# Command kinds; at most one command of each kind is pending per device
+KIND_STATUS = "status"
+KIND_VOLUME = "volume"
+
+
+class _Command:
+    """A queued command and the futures of every caller waiting on it."""
+
+    __slots__ = ("kind", "url", "description", "futures")
+
+    def __init__(self, kind: str, url: str, description: str, future: asyncio.Future):
+        self.kind = kind
+        self.url = url
+        self.description = description
+        self.futures = [future]
+
+
+class DeviceCommandQueue:
+    """Serialise commands for one device, coalescing redundant ones.
+
+    A pending command of the same kind is replaced by the newest one, so a
+    burst of volume changes collapses into the latest value. A command that
+    matches the one already in flight is dropped and its caller waits on the
+    in-flight request instead. Requests are spaced at least ``min_interval``
+    seconds apart, which bounds the rate the hub sees for each device.
+    """
+
+    def __init__(self, send: Callable[[str, str], Awaitable[None]], min_interval: float):
+        self._send = send
+        self._min_interval = min_interval
+        self._pending: dict[str, _Command] = {}
+        self._in_flight: _Command | None = None
+        self._worker: asyncio.Task | None = None
+        self._last_sent = 0.0
+
+    @property
+    def idle(self) -> bool:
+        """Return True when nothing is pending or in flight."""
+        return not self._pending and self._in_flight is None
+
+    def submit(self, kind: str, url: str, description: str) -> Awaitable[None]:
+        """Queue a command and return an awaitable for its completion."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        in_flight = self._in_flight
+        pending = self._pending.get(kind)
+
+        if in_flight is not None and in_flight.kind == kind and in_flight.url == url:
+            # The request on the wire already produces the latest state
+            in_flight.futures.append(future)
+            if pending is not None:
+                del self._pending[kind]
+                in_flight.futures.extend(pending.futures)
+            _LOGGER.debug("Dropped duplicate command: %s", description)
+        elif pending is not None:
+            pending.url = url
+            pending.description = description
+            pending.futures.append(future)
+            _LOGGER.debug("Coalesced pending command into: %s", description)
+        else:
+            self._pending[kind] = _Command(kind, url, description, future)
+
+        if self._worker is None:
+            self._worker = loop.create_task(self._run())
+
+        # Shield so a cancelled caller does not cancel a request others share
+        return asyncio.shield(future)
+
+    def cancel(self) -> None:
+        """Cancel the worker and fail everything still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+        for command in self._pending.values():
+            _resolve(command, asyncio.CancelledError())
+        self._pending.clear()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                delay = self._last_sent + self._min_interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    if not self._pending:
+                        break
+
+                kind = next(iter(self._pending))
+                command = self._in_flight = self._pending.pop(kind)
+                self._last_sent = loop.time()
+                try:
+                    await self._send(command.url, command.description)
+                except asyncio.CancelledError:
+                    _resolve(command, asyncio.CancelledError())
+                    raise
+                except Exception as err:  # pylint: disable=broad-except
+                    _resolve(command, err)
+                else:
+                    _resolve(command, None)
+                finally:
+                    self._in_flight = None
+        finally:
+            self._worker = None
+
+
+def _resolve(command: _Command, error: BaseException | None) -> None:
+    for future in command.futures:
+        if future.done():
+            continue
+        if error is None:
+            future.set_result(None)
+        elif isinstance(error, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(error)
@@ -1,18 +1,96 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+import uuid
 from typing import Any
 
 from homeassistant import config_entries
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from aiohttp import ClientSession
+from aiohttp import ClientTimeout
 
-from .const import DOMAIN
-from .tuneblade import TuneBladeApiClient
+from .const import (
+    CONF_DEVICE_TTL,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_FAST_INTERVAL,
+    CONF_GROUP_DEVICES,
+    CONF_GROUP_ID,
+    CONF_GROUP_NAME,
+    CONF_GROUPS,
+    CONF_IDLE_INTERVAL,
+    CONF_MAX_BACKOFF,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_DEVICE_TTL,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_MAX_BACKOFF,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .tuneblade import TuneBladeApiClient, TuneBladeError
 
 _LOGGER = logging.getLogger(__name__)
 
+# Probes answer "is there a TuneBlade hub here", so they fail fast and are not retried
+PROBE_TIMEOUT = ClientTimeout(total=3)
+# Seconds a successful probe is reused, hubs re-announce on every interface
+PROBE_CACHE_TTL = 300
+DATA_PROBES = f"{DOMAIN}_probes"
+
+
+class HubProber:
+    """Probe hubs through the shared session, one request per host:port at a time."""
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._pending: dict[tuple[str, int], asyncio.Future] = {}
+        # (host, port) -> (monotonic time, device count) of recent successful probes
+        self._results: dict[tuple[str, int], tuple[float, int]] = {}
+
+    async def async_probe(self, host: str, port: int) -> int:
+        """Return the number of devices the hub reports, 0 if it could not be read."""
+        key = (host, port)
+        cached = self._results.get(key)
+        if cached is not None:
+            if time.monotonic() - cached[0] < PROBE_CACHE_TTL:
+                return cached[1]
+            del self._results[key]
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = self._hass.async_create_task(
+                self._async_probe(host, port), f"{DOMAIN} probe {host}:{port}"
+            )
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _async_probe(self, host: str, port: int) -> int:
+        client = TuneBladeApiClient(
+            host, port, async_get_clientsession(self._hass), poll_timeout=PROBE_TIMEOUT, poll_attempts=1
+        )
+        try:
+            devices = await client.async_get_data()
+        except TuneBladeError as err:
+            _LOGGER.debug("Probing TuneBlade hub at %s:%s failed: %s", host, port, err)
+            return 0
+        if devices:
+            self._results[(host, port)] = (time.monotonic(), len(devices))
+        return len(devices)
+
+
+async def async_probe_hub(hass: HomeAssistant, host: str, port: int) -> int:
+    """Probe a hub with the domain's shared prober."""
+    prober = hass.data.get(DATA_PROBES)
+    if prober is None:
+        prober = hass.data[DATA_PROBES] = HubProber(hass)
+    return await prober.async_probe(host, port)
+
 
 class TuneBladeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
@@ -20,8 +98,15 @@ class TuneBladeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self) -> None:
         self._discovery_info: dict[str, Any] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> TuneBladeOptionsFlow:
+        """Return the options flow for this handler."""
+        return TuneBladeOptionsFlow()
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         """Manual user setup step."""
+        errors: dict[str, str] = {}
         if user_input is not None:
             name = user_input.get("name", "TuneBlade").split("@")[0].strip()
             host = user_input["host"]
@@ -31,15 +116,17 @@ class TuneBladeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             await self.async_set_unique_id(unique_id)
             self._abort_if_unique_id_configured()
 
-            self._discovery_info = {
-                "host": host,
-                "port": port,
-                "name": name,
-            }
-            return self.async_create_entry(
-                title=name,
-                data=self._discovery_info,
-            )
+            if await async_probe_hub(self.hass, host, port):
+                self._discovery_info = {
+                    "host": host,
+                    "port": port,
+                    "name": name,
+                }
+                return self.async_create_entry(
+                    title=name,
+                    data=self._discovery_info,
+                )
+            errors["base"] = "cannot_connect"
 
         data_schema = vol.Schema(
             {
@@ -48,7 +135,7 @@ class TuneBladeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Optional("name", default="TuneBlade"): str,
             }
         )
-        return self.async_show_form(step_id="user", data_schema=data_schema)
+        return self.async_show_form(step_id="user", data_schema=data_schema, errors=errors)
 
     async def async_step_zeroconf(self, discovery_info: Any) -> FlowResult:
         """Handle zeroconf discovery."""
@@ -68,15 +155,8 @@ class TuneBladeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             "name": name,
         }
 
-        # Probe the device by attempting to fetch data via TuneBladeApiClient
-        session = ClientSession()
-        client = TuneBladeApiClient(host, port, session)
-        try:
-            devices = await client.async_get_data()
-        finally:
-            await session.close()
-
-        if not devices:
+        # Announcements of one hub on several interfaces share one probe
+        if not await async_probe_hub(self.hass, host, port):
             return self.async_abort(reason="cannot_connect")
 
         self.context["title_placeholders"] = {"name": name}
@@ -100,3 +180,103 @@ class TuneBladeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=vol.Schema({}),
             last_step=True,
         )
+
+
+class TuneBladeOptionsFlow(config_entries.OptionsFlow):
+    """Polling bounds and speaker groups for an existing TuneBlade hub."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Pick what to change."""
+        menu_options = ["polling", "add_group"]
+        if self.config_entry.options.get(CONF_GROUPS):
+            menu_options.append("remove_group")
+        return self.async_show_menu(step_id="init", menu_options=menu_options)
+
+    def _save(self, **changes) -> FlowResult:
+        return self.async_create_entry(title="", data={**self.config_entry.options, **changes})
+
+    async def async_step_polling(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Manage the polling options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if not (
+                user_input[CONF_FAST_INTERVAL]
+                <= user_input[CONF_SCAN_INTERVAL]
+                <= user_input[CONF_IDLE_INTERVAL]
+            ):
+                errors["base"] = "invalid_intervals"
+            else:
+                return self._save(**user_input)
+
+        options = {**self.config_entry.options, **(user_input or {})}
+        seconds = vol.All(vol.Coerce(int), vol.Range(min=1, max=3600))
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_FAST_INTERVAL, default=options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL)
+                ): seconds,
+                vol.Required(
+                    CONF_SCAN_INTERVAL, default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+                ): seconds,
+                vol.Required(
+                    CONF_IDLE_INTERVAL, default=options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL)
+                ): seconds,
+                vol.Required(
+                    CONF_MAX_BACKOFF, default=options.get(CONF_MAX_BACKOFF, DEFAULT_MAX_BACKOFF)
+                ): seconds,
+                vol.Required(
+                    CONF_DEVICE_TTL, default=options.get(CONF_DEVICE_TTL, DEFAULT_DEVICE_TTL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=8760)),
+                vol.Required(
+                    CONF_MIN_WRITE_INTERVAL,
+                    default=options.get(CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+            }
+        )
+        return self.async_show_form(step_id="polling", data_schema=data_schema, errors=errors)
+
+    async def async_step_add_group(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Define a speaker group from the hub's current devices."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if not user_input[CONF_GROUP_DEVICES]:
+                errors["base"] = "no_devices"
+            else:
+                group = {
+                    CONF_GROUP_ID: uuid.uuid4().hex[:8],
+                    CONF_GROUP_NAME: user_input[CONF_GROUP_NAME],
+                    CONF_GROUP_DEVICES: list(user_input[CONF_GROUP_DEVICES]),
+                }
+                return self._save(**{CONF_GROUPS: [*self.config_entry.options.get(CONF_GROUPS, []), group]})
+
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        if coordinator is None:
+            return self.async_abort(reason="not_loaded")
+        devices = {
+            device_id: device.name
+            for device_id, device in (coordinator.data or {}).items()
+            if device_id != "MASTER"
+        }
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_GROUP_NAME): str,
+                vol.Required(CONF_GROUP_DEVICES, default=[]): cv.multi_select(devices),
+            }
+        )
+        return self.async_show_form(step_id="add_group", data_schema=data_schema, errors=errors)
+
+    async def async_step_remove_group(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Delete speaker groups."""
+        groups = self.config_entry.options.get(CONF_GROUPS, [])
+        if user_input is not None:
+            removed = set(user_input[CONF_GROUPS])
+            return self._save(**{CONF_GROUPS: [group for group in groups if group[CONF_GROUP_ID] not in removed]})
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_GROUPS, default=[]): cv.multi_select(
+                    {group[CONF_GROUP_ID]: group[CONF_GROUP_NAME] for group in groups}
+                ),
+            }
+        )
+        return self.async_show_form(step_id="remove_group", data_schema=data_schema)
@@ -16,7 +16,8 @@ MEDIA_PLAYER_DEVICE_CLASS = "speaker"
 # Platforms
 SWITCH = "switch"
 MEDIA_PLAYER = "media_player"
-PLATFORMS = [SWITCH, MEDIA_PLAYER]
+SENSOR = "sensor"
+PLATFORMS = [SWITCH, MEDIA_PLAYER, SENSOR]
 
 # Configuration and options
 CONF_ENABLED = "enabled"
@@ -24,9 +25,52 @@ CONF_USERNAME = "username"
 CONF_DEVICE_ID = "device_id"
 CONF_HOST = "host"
 CONF_PORT = "port"
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_IDLE_INTERVAL = "idle_interval"
+CONF_MAX_BACKOFF = "max_backoff"
+CONF_DEVICE_TTL = "device_ttl"
+CONF_MIN_WRITE_INTERVAL = "min_write_interval"
+CONF_GROUPS = "groups"
+CONF_GROUP_ID = "id"
+CONF_GROUP_NAME = "name"
+CONF_GROUP_DEVICES = "device_ids"
+
+# Services
+SERVICE_BULK_COMMAND = "bulk_command"
+ATTR_DEVICE_IDS = "device_ids"
+ATTR_ACTION = "action"
+ATTR_VOLUME_LEVEL = "volume_level"
+ATTR_MAX_CONCURRENCY = "max_concurrency"
+SERVICE_VOLUME_RAMP = "volume_ramp"
+ATTR_DURATION = "duration"
+ATTR_CURVE = "curve"
+SERVICE_PROFILE = "profile"
+ATTR_POLLS = "polls"
+ATTR_TOP = "top"
+SERVICE_TIMING_SPANS = "timing_spans"
+ATTR_ENABLED = "enabled"
+SERVICE_RECORD = "record"
+SERVICE_SNAPSHOT = "snapshot"
+SERVICE_RESTORE = "restore"
+ATTR_NAME = "name"
 
 # Defaults
 DEFAULT_NAME = DOMAIN
+DEFAULT_SCAN_INTERVAL = 10
+DEFAULT_FAST_INTERVAL = 2
+DEFAULT_IDLE_INTERVAL = 60
+DEFAULT_MAX_BACKOFF = 300
+# Hours a device may be missing from the hub before it is removed, 0 keeps it forever
+DEFAULT_DEVICE_TTL = 24
+# Seconds between state writes of an entity whose state is unchanged, 0 writes every change
+DEFAULT_MIN_WRITE_INTERVAL = 5
+# Device cache storage
+STORAGE_VERSION = 1
+# Seconds to batch device cache writes, volumes change often
+CACHE_SAVE_DELAY = 60
+# Seconds of fast polling after a command
+FAST_POLL_WINDOW = 30
 
 STARTUP_MESSAGE = f"""
 -------------------------------------------------------------------
@@ -1,33 +1,648 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
 import logging
+import time
 from datetime import timedelta
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 
-from .tuneblade import TuneBladeApiClient
-from .const import DOMAIN
+from .breaker import STATE_OPEN
+from .parser import STATUS_DISCONNECTED, STATUS_PLAYING, TuneBladeDevice
+from .entity import device_identifier
+from .view import DeviceView
+from .tuneblade import (
+    ACTION_CONNECT,
+    ACTION_DISCONNECT,
+    ACTION_VOLUME,
+    BATCH_CONCURRENCY,
+    TuneBladeApiClient,
+    TuneBladeCircuitOpenError,
+    TuneBladeError,
+)
+from .const import (
+    CACHE_SAVE_DELAY,
+    CONF_DEVICE_TTL,
+    CONF_FAST_INTERVAL,
+    CONF_IDLE_INTERVAL,
+    CONF_MAX_BACKOFF,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_DEVICE_TTL,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_MAX_BACKOFF,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    FAST_POLL_WINDOW,
+    STORAGE_VERSION,
+)
+
+if TYPE_CHECKING:
+    from .group import SpeakerGroup
+    from .scheduler import TuneBladePollScheduler
 
 _LOGGER = logging.getLogger(__name__)
-SCAN_INTERVAL = timedelta(seconds=10)
+SCAN_INTERVAL = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+# Delay before the poll that confirms optimistic command results
+CONFIRM_DELAY = 1.5
+# Up to this many commanded devices are confirmed one by one, more get a full poll
+CONFIRM_TARGETED_MAX = 4
+
+
+def storage_key(entry_id: str) -> str:
+    """Return the storage key of an entry's device cache."""
+    return f"{DOMAIN}.{entry_id}.devices"
+
 
 class TuneBladeDataUpdateCoordinator(DataUpdateCoordinator):
     """Coordinator to fetch data from the TuneBlade hub."""
 
-    def __init__(self, hass: HomeAssistant, client: TuneBladeApiClient, scan_interval: timedelta = SCAN_INTERVAL):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: TuneBladeApiClient,
+        scan_interval: timedelta = SCAN_INTERVAL,
+        config_entry: ConfigEntry | None = None,
+    ):
         """Initialize the coordinator."""
-        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=scan_interval)
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=config_entry,
+            name=DOMAIN,
+            update_interval=scan_interval,
+            always_update=False,
+        )
         self.client = client
         self.data = {}
+        self._scan_interval = scan_interval
+        # Interval the coordinator wants; a shared scheduler may own the timer
+        self.poll_interval = scan_interval
+        self._scheduler: TuneBladePollScheduler | None = None
+        self._fast_interval = timedelta(seconds=DEFAULT_FAST_INTERVAL)
+        self._idle_interval = timedelta(seconds=DEFAULT_IDLE_INTERVAL)
+        self._max_backoff = timedelta(seconds=DEFAULT_MAX_BACKOFF)
+        self._fast_until = 0.0
+        self._failures = 0
+        # device_id -> listeners; listeners without a device context live under None
+        self._device_listeners: dict[str | None, dict[CALLBACK_TYPE, None]] = {}
+        # Device IDs changed by the last snapshot, None means "notify everyone"
+        self._changed_ids: set[str] | None = None
+        self._notified_success = True
+        # device_id -> revision, bumped whenever the device's record is dispatched as changed
+        self.revisions: dict[str, int] = {}
+        self._views: dict[str, DeviceView] = {}
+        # Devices that have entities, and since when the missing ones have been gone
+        self._known_ids: set[str] = set()
+        self._missing_since: dict[str, float] = {}
+        self._device_ttl = DEFAULT_DEVICE_TTL * 3600
+        self.min_write_interval = DEFAULT_MIN_WRITE_INTERVAL
+        self._new_device_listeners: dict[Callable[[list[str]], None], None] = {}
+        # device_id -> fields expected after a command, until a confirm poll runs
+        self._optimistic: dict[str, dict] = {}
+        # Devices whose rolled back state is being dispatched
+        self._rolled_back: set[str] = set()
+        # Devices commanded since the last confirmation
+        self._confirm_ids: set[str] = set()
+        # True while self.data differs from the last polled snapshot
+        self._local_changes = False
+        # Body digest of the last polled snapshot applied to self.data; the
+        # client's own digest also moves with fetches made for other callers
+        self._applied_digest: bytes | None = None
+        self._confirm_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=CONFIRM_DELAY,
+            immediate=False,
+            function=self._async_confirm,
+        )
+        self._remove_breaker_listener = client.breaker.add_listener(self._handle_breaker_state)
+        self._store: Store | None = None
+        if config_entry is not None:
+            self._store = Store(hass, STORAGE_VERSION, storage_key(config_entry.entry_id))
+        self._cached: list | None = None
+        self._cache_dirty = False
+        # group_id -> SpeakerGroup defined in the entry options
+        self.groups: dict[str, SpeakerGroup] = {}
+
+    async def async_load_cache(self) -> bool:
+        """Seed the snapshot with the last known devices, marked unavailable.
+
+        Returns True if cached devices were loaded, so entities can be created
+        before the hub has answered.
+        """
+        if self._store is None:
+            return False
+        stored = await self._store.async_load()
+        if not stored or not stored.get("devices"):
+            return False
+
+        self._cached = stored["devices"]
+        self.data = {
+            device["id"]: TuneBladeDevice(device["id"], device["name"], None, device.get("volume"))
+            for device in self._cached
+        }
+        self.last_update_success = False
+        self._notified_success = False
+        self._local_changes = True
+        self._known_ids = set(self.data)
+        _LOGGER.debug("Loaded %s TuneBlade devices from cache", len(self.data))
+        return True
+
+    @callback
+    def _async_save_cache(self, devices: dict) -> None:
+        """Persist IDs, names and volumes when they changed since the last save."""
+        if self._store is None:
+            return
+        cached = [
+            {"id": device.id, "name": device.name, "volume": device.volume}
+            for device in devices.values()
+        ]
+        if cached == self._cached:
+            return
+        self._cached = cached
+        self._cache_dirty = True
+        self._store.async_delay_save(self._cache_data, CACHE_SAVE_DELAY)
+
+    def _cache_data(self) -> dict:
+        self._cache_dirty = False
+        return {"devices": self._cached}
+
+    @callback
+    def async_configure_polling(self, options: dict) -> None:
+        """Apply polling bounds from the config entry options."""
+        self._scan_interval = timedelta(seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
+        self._fast_interval = timedelta(seconds=options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL))
+        self._idle_interval = timedelta(seconds=options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL))
+        self._max_backoff = timedelta(seconds=options.get(CONF_MAX_BACKOFF, DEFAULT_MAX_BACKOFF))
+        self._device_ttl = options.get(CONF_DEVICE_TTL, DEFAULT_DEVICE_TTL) * 3600
+        self.min_write_interval = options.get(CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL)
+        self._set_poll_interval(self._next_interval(self.data))
+        if self._scheduler is not None:
+            self._scheduler.async_reschedule(self)
+
+    @callback
+    def async_attach_scheduler(self, scheduler: TuneBladePollScheduler | None) -> None:
+        """Hand periodic polling to a shared scheduler, or take it back with None."""
+        self._scheduler = scheduler
+        self.update_interval = None if scheduler is not None else self.poll_interval
+
+    @callback
+    def _async_start_fast_window(self) -> None:
+        """Poll fast for a while after a command, starting with the next poll.
+
+        Targeted confirmations do not run a full update, so the shorter
+        interval is applied and the next poll rescheduled right away.
+        """
+        self._fast_until = time.monotonic() + FAST_POLL_WINDOW
+        interval = self._next_interval(self.data)
+        if interval == self.poll_interval:
+            return
+        self._set_poll_interval(interval)
+        if self._scheduler is not None:
+            self._scheduler.async_reschedule(self)
+        elif self._listeners:
+            self._schedule_refresh()
+
+    def _set_poll_interval(self, interval: timedelta) -> None:
+        self.poll_interval = interval
+        if self._scheduler is None:
+            self.update_interval = interval
+
+    def _next_interval(self, devices: dict | None) -> timedelta:
+        """Pick the poll interval from recent commands, device activity and hub health."""
+        if self._failures:
+            backoff = self._scan_interval * (2 ** min(self._failures - 1, 16))
+            return min(backoff, self._max_backoff)
+        if time.monotonic() < self._fast_until:
+            return self._fast_interval
+        if not devices:
+            return self._scan_interval
+        codes = {device.status_code for device in devices.values()}
+        if STATUS_PLAYING in codes:
+            return self._fast_interval
+        if codes == {STATUS_DISCONNECTED}:
+            return self._idle_interval
+        return self._scan_interval
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE, context=None) -> CALLBACK_TYPE:
+        """Listen for updates, indexing the listener by its device ID context."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        listeners = self._device_listeners.setdefault(context, {})
+        listeners[update_callback] = None
+
+        @callback
+        def remove_device_listener() -> None:
+            remove_listener()
+            listeners.pop(update_callback, None)
+            if not listeners and self._device_listeners.get(context) is listeners:
+                del self._device_listeners[context]
+
+        return remove_device_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners of devices that changed since the last dispatch."""
+        with self.client.stats.span("dispatch"):
+            self._async_dispatch()
+
+    @callback
+    def _async_dispatch(self) -> None:
+        changed = self._changed_ids
+        self._changed_ids = None
+        if changed is None:
+            self._views.clear()
+            self._async_track_devices(self._known_ids | (self.data or {}).keys())
+        else:
+            for device_id in changed:
+                self.revisions[device_id] = self.revisions.get(device_id, 0) + 1
+            self._async_track_devices(changed)
+
+        if changed is None or self.last_update_success != self._notified_success:
+            self._notified_success = self.last_update_success
+            super().async_update_listeners()
+            return
+
+        if not changed:
+            return
+
+        callbacks = []
+        for device_id in changed:
+            callbacks.extend(self._device_listeners.get(device_id, ()))
+        callbacks.extend(self._device_listeners.get(None, ()))
+
+        for update_callback in callbacks:
+            update_callback()
+
+    @callback
+    def async_add_new_devices_listener(self, new_devices_callback: Callable[[list[str]], None]) -> CALLBACK_TYPE:
+        """Call new_devices_callback(device_ids) for devices that need entities; returns a remover."""
+        self._new_device_listeners[new_devices_callback] = None
+        return lambda: self._new_device_listeners.pop(new_devices_callback, None)
+
+    @callback
+    def _async_track_devices(self, device_ids) -> None:
+        """Note devices appearing or going missing among the changed IDs."""
+        data = self.data or {}
+        new = []
+        for device_id in device_ids:
+            if device_id in data:
+                self._missing_since.pop(device_id, None)
+                if device_id not in self._known_ids:
+                    self._known_ids.add(device_id)
+                    new.append(device_id)
+            elif device_id in self._known_ids:
+                self._missing_since.setdefault(device_id, time.monotonic())
+        if new:
+            for new_devices_callback in list(self._new_device_listeners):
+                new_devices_callback(new)
+
+    @callback
+    def async_track_registry_devices(self) -> None:
+        """Start the removal clock for registered devices the hub no longer reports."""
+        if self.config_entry is None:
+            return
+        entry_prefix = f"{self.config_entry.entry_id}_"
+        data = self.data or {}
+        now = time.monotonic()
+        for device in dr.async_entries_for_config_entry(dr.async_get(self.hass), self.config_entry.entry_id):
+            for domain, identifier in device.identifiers:
+                if domain != DOMAIN or not identifier.startswith(entry_prefix):
+                    continue
+                device_id = identifier[len(entry_prefix):]
+                if device_id == "MASTER" or device_id.startswith("group_"):
+                    continue
+                if device_id not in data:
+                    self._missing_since.setdefault(device_id, now)
+
+    @callback
+    def _async_evict_stale(self) -> None:
+        """Remove devices missing from the hub for longer than the TTL, with their entities."""
+        if not self._device_ttl or not self._missing_since or self.config_entry is None:
+            return
+        cutoff = time.monotonic() - self._device_ttl
+        stale = [
+            device_id
+            for device_id, since in self._missing_since.items()
+            if since <= cutoff and device_id != "MASTER"
+        ]
+        if not stale:
+            return
+
+        device_registry = dr.async_get(self.hass)
+        for device_id in stale:
+            del self._missing_since[device_id]
+            self._known_ids.discard(device_id)
+            self.revisions.pop(device_id, None)
+            self._views.pop(device_id, None)
+            self._optimistic.pop(device_id, None)
+            self.client.forget_device(device_id)
+            device = device_registry.async_get_device(
+                identifiers={device_identifier(self.config_entry.entry_id, device_id)}
+            )
+            if device is not None:
+                # Removing the entry from the device also removes its entities
+                device_registry.async_update_device(device.id, remove_config_entry_id=self.config_entry.entry_id)
+            _LOGGER.info("Removed TuneBlade device %s, missing for over %ss", device_id, self._device_ttl)
+
+    def needs_immediate_write(self, device_id: str) -> bool:
+        """Return True if the device's entities must write now, unthrottled.
+
+        That is while a command's expected state awaits confirmation, and
+        while the state of a failed command is being rolled back.
+        """
+        return device_id in self._optimistic or device_id in self._rolled_back
+
+    def device_view(self, device_id: str) -> DeviceView:
+        """Return the device's view, rebuilt only when its revision changed."""
+        revision = self.revisions.get(device_id, 0)
+        view = self._views.get(device_id)
+        if view is None or view.revision != revision:
+            view = self._views[device_id] = DeviceView(device_id, revision, (self.data or {}).get(device_id))
+        return view
+
+    @callback
+    def _handle_breaker_state(self, state: str) -> None:
+        """Mark every entity unavailable as soon as the hub circuit opens."""
+        if state == STATE_OPEN and self.last_update_success:
+            self.async_set_update_error(UpdateFailed("TuneBlade hub is failing, circuit open"))
+
+    @callback
+    def async_apply_optimistic(self, device_id: str, **changes) -> None:
+        """Apply the expected result of a command locally and notify the device's entities."""
+        device = (self.data or {}).get(device_id)
+        if device is None:
+            return
+        self._async_start_fast_window()
+        self._optimistic.setdefault(device_id, {}).update(changes)
+        self.data = {**self.data, device_id: device.replace(**changes)}
+        self._local_changes = True
+        self._changed_ids = {device_id}
+        self.async_update_listeners()
+
+    async def async_run_command(self, device_id: str, command: Awaitable, **expected) -> None:
+        """Show a command's expected state now and confirm it with one deferred poll.
+
+        Commands issued in quick succession share a single confirmation poll.
+        """
+        previous = (self.data or {}).get(device_id)
+        self.async_apply_optimistic(device_id, **expected)
+        try:
+            await command
+        except TuneBladeError as err:
+            self._async_rollback(device_id, previous)
+            raise HomeAssistantError(str(err)) from err
+        finally:
+            self._confirm_ids.add(device_id)
+            self._confirm_debouncer.async_schedule_call()
+
+    @callback
+    def _async_rollback(self, device_id: str, previous) -> None:
+        """Restore a device record after its command failed."""
+        self._optimistic.pop(device_id, None)
+        if previous is None or device_id not in (self.data or {}):
+            return
+        self.data = {**self.data, device_id: previous}
+        self._local_changes = True
+        self._changed_ids = {device_id}
+        self._rolled_back.add(device_id)
+        try:
+            self.async_update_listeners()
+        finally:
+            self._rolled_back.discard(device_id)
+
+    async def async_run_batch(
+        self,
+        device_ids: list[str],
+        action: str,
+        volume: int | None = None,
+        max_concurrency: int = BATCH_CONCURRENCY,
+    ) -> dict[str, str | None]:
+        """Run one action on many devices concurrently, then refresh once."""
+        return await self.async_run_commands(
+            [(device_id, action, volume) for device_id in device_ids], max_concurrency
+        )
+
+    def snapshot_states(self, device_ids=None) -> dict[str, dict]:
+        """Return the connection and volume of the given (default: all) devices."""
+        devices = self.data or {}
+        if device_ids is None:
+            device_ids = devices
+        return {
+            device_id: {
+                "name": devices[device_id].name,
+                "connected": devices[device_id].connected,
+                "volume": devices[device_id].volume,
+            }
+            for device_id in device_ids
+            if device_id in devices
+        }
+
+    def plan_states(self, states: dict[str, dict]) -> tuple[list[tuple[str, str, int | None]], list[str]]:
+        """Return the commands that bring devices to the given states.
+
+        Only fields that differ from the current data produce a command.
+        Volume is set before connecting so a restored speaker does not start
+        at its old level. Returns the commands and the devices that are not
+        reported by the hub.
+        """
+        devices = self.data or {}
+        commands = []
+        missing = []
+        for device_id, state in states.items():
+            device = devices.get(device_id)
+            if device is None:
+                missing.append(device_id)
+                continue
+            volume = state.get("volume")
+            if volume is not None and volume != device.volume:
+                commands.append((device_id, ACTION_VOLUME, volume))
+            connected = state.get("connected")
+            if connected is not None and connected != device.connected:
+                commands.append((device_id, ACTION_CONNECT if connected else ACTION_DISCONNECT, None))
+        return commands, missing
+
+    async def async_run_commands(
+        self,
+        commands: list[tuple[str, str, int | None]],
+        max_concurrency: int = BATCH_CONCURRENCY,
+    ) -> dict[str, str | None]:
+        """Run a command plan concurrently per device, then refresh once."""
+        for device_id, action, volume in commands:
+            if action == ACTION_CONNECT:
+                self.async_apply_optimistic(device_id, status_code=STATUS_PLAYING)
+            elif action == ACTION_DISCONNECT:
+                self.async_apply_optimistic(device_id, status_code=STATUS_DISCONNECTED)
+            else:
+                self.async_apply_optimistic(device_id, volume=volume)
+        try:
+            return await self.client.async_run_commands(commands, max_concurrency)
+        finally:
+            self._confirm_ids.update(device_id for device_id, _, _ in commands)
+            await self._async_confirm()
+
+    @callback
+    def async_start_ramp(self, device_ids: list[str], target: int, duration: float, curve: str) -> list[str]:
+        """Fade devices to a target volume; returns the IDs that were started.
+
+        Ramp steps do not refresh anything; the target is applied and
+        confirmed once a ramp completes.
+        """
+        started = []
+        for device_id in device_ids:
+            device = (self.data or {}).get(device_id)
+            if device is None:
+                continue
+            start = device.volume if device.volume is not None else target
+            task = self.client.ramps.start(device_id, start, target, duration, curve)
+            task.add_done_callback(lambda task, device_id=device_id: self._async_ramp_done(device_id, target, task))
+            started.append(device_id)
+        return started
+
+    @callback
+    def _async_ramp_done(self, device_id: str, target: int, task: asyncio.Task) -> None:
+        if task.cancelled():
+            # Replaced by a new ramp or a manual change, which confirms itself
+            return
+        if (err := task.exception()) is not None:
+            _LOGGER.warning("Volume ramp for %s stopped: %s", device_id, err)
+        else:
+            self.async_apply_optimistic(device_id, volume=target)
+        self._confirm_ids.add(device_id)
+        self._confirm_debouncer.async_schedule_call()
+
+    async def _async_confirm(self) -> None:
+        """Drop settled optimistic state and let a fresh read reconcile it.
+
+        A few commanded devices are re-read individually; larger bursts get
+        one full poll. Devices with commands still queued keep their expected
+        state; the completion of those commands schedules another confirmation.
+        """
+        device_ids, self._confirm_ids = self._confirm_ids, set()
+        self._optimistic = {
+            device_id: expected
+            for device_id, expected in self._optimistic.items()
+            if self.client.commands_pending(device_id)
+        }
+        if not device_ids or len(device_ids) > CONFIRM_TARGETED_MAX or not self.last_update_success:
+            await self.async_refresh()
+            return
+        await asyncio.gather(*(self.async_refresh_device(device_id) for device_id in device_ids))
+
+    async def async_refresh_device(self, device_id: str) -> None:
+        """Re-read one device and notify only its entities if it changed."""
+        scheduler = self._scheduler
+        limiter = scheduler.fetch_limiter if scheduler is not None else contextlib.nullcontext()
+        try:
+            async with limiter:
+                device = await self.client.async_get_device(device_id)
+        except TuneBladeError as err:
+            # An open circuit already marked the entities unavailable
+            _LOGGER.debug("Refreshing TuneBlade device %s failed: %s", device_id, err)
+            return
+        self.async_merge_device(device_id, device)
+
+    @callback
+    def async_merge_device(self, device_id: str, device) -> None:
+        """Merge one device record into the current snapshot."""
+        data = self.data or {}
+        if device is None:
+            if device_id not in data:
+                return
+            data = dict(data)
+            del data[device_id]
+        else:
+            expected = self._optimistic.get(device_id)
+            if expected:
+                device = device.replace(**expected)
+            if device.same_state(data.get(device_id)):
+                return
+            data = {**data, device_id: device}
+        self.data = data
+        self._local_changes = True
+        self._changed_ids = {device_id}
+        self.async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending confirmation poll and flush the device cache.
+
+        Writing the cache now instead of on its delay keeps an unloaded
+        coordinator from being held by the store's timer.
+        """
+        await super().async_shutdown()
+        self._confirm_debouncer.async_cancel()
+        self._remove_breaker_listener()
+        if self._store is not None and self._cache_dirty:
+            await self._store.async_save(self._cache_data())
+
+    def _diff(self, devices: dict) -> set[str]:
+        """Return the IDs of devices added, removed or changed since the last snapshot."""
+        previous = self.data or {}
+        changed = set(previous.keys() - devices.keys())
+        for device_id, device in devices.items():
+            if not device.same_state(previous.get(device_id)):
+                changed.add(device_id)
+        return changed
 
     async def _async_update_data(self):
         """Fetch the latest data from TuneBlade."""
+        start = time.perf_counter()
+        scheduler = self._scheduler
+        limiter = scheduler.fetch_limiter if scheduler is not None else contextlib.nullcontext()
         try:
-            devices_data = await self.client.async_get_data()
+            async with limiter:
+                devices_data = await self.client.async_get_data()
+            digest = self.client.digest
             if not devices_data:
                 raise UpdateFailed("No device data returned from TuneBlade hub.")
 
-            _LOGGER.debug("Fetched device data: %s", devices_data)
+            if digest is not None and digest == self._applied_digest and not self._local_changes:
+                # Same body as last time and nothing changed locally: skip diff and dispatch
+                self._changed_ids = set()
+                devices_data = self.data
+            else:
+                _LOGGER.debug("Fetched device data: %s", devices_data)
+                if self._optimistic:
+                    # Keep showing expected state for commands that are still queued;
+                    # copy first, the client keeps the parsed snapshot for reuse
+                    devices_data = dict(devices_data)
+                    for device_id, expected in self._optimistic.items():
+                        if device_id in devices_data:
+                            devices_data[device_id] = devices_data[device_id].replace(**expected)
+                with self.client.stats.span("diff"):
+                    self._changed_ids = self._diff(devices_data)
+                if self._changed_ids:
+                    self._async_save_cache(devices_data)
+                self._local_changes = bool(self._optimistic)
+                self._applied_digest = digest
+            self._failures = 0
+            self._async_evict_stale()
+            self._set_poll_interval(self._next_interval(devices_data))
+            self.client.stats.update_time.add((time.perf_counter() - start) * 1000)
             return devices_data
 
+        except TuneBladeCircuitOpenError as err:
+            self._failures += 1
+            self._set_poll_interval(self._next_interval(None))
+            raise UpdateFailed(str(err)) from err
+
         except Exception as err:
-            _LOGGER.exception("Error fetching data from TuneBlade hub")
+            self._failures += 1
+            self._set_poll_interval(self._next_interval(None))
+            _LOGGER.debug("Error fetching data from TuneBlade hub", exc_info=True)
             raise UpdateFailed(f"Error communicating with TuneBlade hub: {err}") from err
+
+        finally:
+            if scheduler is not None:
+                scheduler.async_reschedule(self)
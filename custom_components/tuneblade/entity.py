@@ -1,40 +1,166 @@
 """TuneBladeEntity base class."""
+import asyncio
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .const import DOMAIN, NAME, VERSION
+from .const import DOMAIN, NAME
+
+
+def device_identifier(entry_id, device_id):
+    """Return the device registry identifier of a TuneBlade device on a config entry's hub.
+
+    Scoped to the entry, so a speaker reported by two hubs gets a device per hub.
+    """
+    return (DOMAIN, f"{entry_id}_{device_id}")
+
+
+def hub_identifier(entry_id):
+    """Return the device registry identifier of a config entry's MASTER hub device."""
+    return device_identifier(entry_id, "MASTER")
+
+
+def hub_device_info(entry_id):
+    """Return the device info of a config entry's hub.
+
+    The hub device exists even if the hub does not report MASTER: the hub's
+    statistics sensors belong to it and speakers link to it via_device.
+    """
+    return {
+        "identifiers": {hub_identifier(entry_id)},
+        "name": "Master",
+        "manufacturer": NAME,
+        "entry_type": "service",  # Mark as hub/service device
+    }
+
+
+class StateWriteLimiter:
+    """Write an entity's state at once when it changes, attribute-only changes at most every interval.
+
+    The state key is read again when a deferred write fires, so the last
+    attributes always get written.
+    """
+
+    def __init__(self, write, state_key, interval, stats):
+        self._write = write
+        self._state_key = state_key
+        self._interval = interval
+        self._stats = stats
+        self._key = None
+        self._last = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_write(self, force: bool = False) -> None:
+        key = self._state_key()
+        interval = self._interval()
+        elapsed = time.monotonic() - self._last
+        if force or key != self._key or interval <= 0 or elapsed >= interval:
+            self._async_write_now(key)
+        elif self._timer is None:
+            self._stats.writes_deferred += 1
+            self._timer = asyncio.get_running_loop().call_later(interval - elapsed, self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        self._timer = None
+        self._async_write_now(self._state_key())
+
+    @callback
+    def _async_write_now(self, key) -> None:
+        self.async_cancel()
+        self._key = key
+        self._last = time.monotonic()
+        self._write()
+
+    @callback
+    def async_cancel(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
 
 class TuneBladeEntity(CoordinatorEntity):
-    """Base entity for TuneBlade devices, including master hub."""
+    """Base entity for TuneBlade devices, including master hub.
 
-    def __init__(self, coordinator, config_entry, device_id=None, device_name=None):
-        """Initialize entity with coordinator, config entry, and optional device info."""
-        super().__init__(coordinator)
-        self.config_entry = config_entry
-        self.device_id = device_id or "master"
-        self.device_name = device_name or "Master"
+    State is read from the coordinator's cached view of the device, which is
+    rebuilt only when the device's record changes.
+    """
+
+    def __init__(self, coordinator, device_id, device_name=None):
+        """Initialize entity with coordinator, device ID and optional device name."""
+        super().__init__(coordinator, context=device_id)
+        self.device_id = device_id
+        self._limiter = StateWriteLimiter(
+            self.async_write_ha_state,
+            lambda: (self.available, self.state),
+            lambda: coordinator.min_write_interval,
+            coordinator.client.stats,
+        )
+        entry_id = coordinator.config_entry.entry_id
+        if device_id == "MASTER":
+            self._attr_device_info = hub_device_info(entry_id)
+        else:
+            self._attr_device_info = {
+                "identifiers": {device_identifier(entry_id, device_id)},
+                "via_device": hub_identifier(entry_id),  # Link to hub device
+                "name": device_name,
+                "manufacturer": NAME,
+            }
 
     @property
-    def unique_id(self):
-        """Return a unique ID for this entity."""
-        return f"{self.config_entry.entry_id}_{self.device_id}"
+    def view(self):
+        """Return the current view of this entity's device."""
+        return self.coordinator.device_view(self.device_id)
 
     @property
-    def device_info(self):
-        """Return device info for this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.device_id)},
-            "name": f"{self.device_name} {NAME}",
-            "model": VERSION,
+    def available(self) -> bool:
+        return self.coordinator.last_update_success and self.view.present
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Commanded changes show at once, polled volume churn is rate limited
+        with self.coordinator.client.stats.span("state_write"):
+            self._limiter.async_write(self.coordinator.needs_immediate_write(self.device_id))
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._limiter.async_cancel)
+
+
+class TuneBladeGroupEntity(Entity):
+    """Base entity for a speaker group, updated from the group's aggregate."""
+
+    _attr_should_poll = False
+
+    def __init__(self, group):
+        self.group = group
+        coordinator = group.coordinator
+        entry_id = coordinator.config_entry.entry_id
+        self._limiter = StateWriteLimiter(
+            self.async_write_ha_state,
+            lambda: (self.available, self.state),
+            lambda: coordinator.min_write_interval,
+            coordinator.client.stats,
+        )
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, f"{entry_id}_group_{group.group_id}")},
+            "via_device": hub_identifier(entry_id),
+            "name": group.name,
             "manufacturer": NAME,
+            "model": "Speaker group",
         }
 
     @property
-    def extra_state_attributes(self):
-        """Return extra attributes for the device."""
-        data = self.coordinator.data or {}
-        device_data = data.get(self.device_id, {})
-        # Return any available details; you can customize as needed
-        return {
-            "connected": device_data.get("connected"),
-            "volume": device_data.get("volume"),
-            "status_code": device_data.get("status_code"),
-        }
+    def available(self) -> bool:
+        return self.group.coordinator.last_update_success
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.group.async_add_listener(self._async_group_updated))
+        self.async_on_remove(self._limiter.async_cancel)
+
+    @callback
+    def _async_group_updated(self) -> None:
+        self._limiter.async_write(self.group.urgent)
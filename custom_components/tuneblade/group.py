@@ -0,0 +1,170 @@
+"""Speaker groups with aggregates maintained from coordinator deltas."""
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .parser import STATUS_PLAYING, TuneBladeDevice
+from .tuneblade import ACTION_CONNECT, ACTION_DISCONNECT, ACTION_VOLUME
+
+if TYPE_CHECKING:
+    from .coordinator import TuneBladeDataUpdateCoordinator
+
+
+class GroupAggregate:
+    """Connected/playing counts and volume statistics of a set of devices.
+
+    Each update removes the device's previous contribution and adds the new
+    one, so a change costs O(1) instead of a pass over every member. Volumes
+    are kept in a 0-100 histogram, which gives min and max in constant time.
+    """
+
+    def __init__(self) -> None:
+        self._members: dict[str, tuple[bool, bool, int | None]] = {}
+        self._histogram = [0] * 101
+        self.connected = 0
+        self.playing = 0
+        self._volume_sum = 0
+        self._volume_count = 0
+
+    def update(self, device_id: str, device: TuneBladeDevice | None) -> bool:
+        """Apply a member's new record (None if gone); returns True if anything changed."""
+        if device is None:
+            entry = None
+        else:
+            volume = device.volume
+            if volume is not None:
+                volume = max(0, min(100, volume))
+            entry = (device.connected, device.status_code == STATUS_PLAYING, volume)
+
+        old = self._members.get(device_id)
+        if old == entry:
+            return False
+        if old is not None:
+            self._apply(old, -1)
+        if entry is None:
+            self._members.pop(device_id, None)
+        else:
+            self._members[device_id] = entry
+            self._apply(entry, 1)
+        return True
+
+    def _apply(self, entry: tuple[bool, bool, int | None], sign: int) -> None:
+        connected, playing, volume = entry
+        self.connected += sign * connected
+        self.playing += sign * playing
+        if volume is not None:
+            self._histogram[volume] += sign
+            self._volume_sum += sign * volume
+            self._volume_count += sign
+
+    @property
+    def reporting(self) -> int:
+        """Members currently present on the hub."""
+        return len(self._members)
+
+    @property
+    def volume_mean(self) -> float | None:
+        if not self._volume_count:
+            return None
+        return self._volume_sum / self._volume_count
+
+    @property
+    def volume_min(self) -> int | None:
+        if not self._volume_count:
+            return None
+        return next(volume for volume, count in enumerate(self._histogram) if count)
+
+    @property
+    def volume_max(self) -> int | None:
+        if not self._volume_count:
+            return None
+        return next(volume for volume in range(100, -1, -1) if self._histogram[volume])
+
+
+class SpeakerGroup:
+    """A named set of devices on one hub, shared by the group entities."""
+
+    def __init__(self, coordinator: TuneBladeDataUpdateCoordinator, group_id: str, name: str, device_ids: list[str]):
+        self.coordinator = coordinator
+        self.group_id = group_id
+        self.name = name
+        self.device_ids = list(device_ids)
+        self.aggregate = GroupAggregate()
+        self._listeners: dict[CALLBACK_TYPE, None] = {}
+        self._notify_scheduled = False
+        self._last_success = coordinator.last_update_success
+        # True while notifying a change that must not be throttled, e.g. a
+        # command's expected state or its rollback
+        self.urgent = False
+        self._urgent_pending = False
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Seed the aggregate and follow member deltas; returns a callback to stop."""
+        data = self.coordinator.data or {}
+        removers = []
+        for device_id in self.device_ids:
+            self.aggregate.update(device_id, data.get(device_id))
+            removers.append(
+                self.coordinator.async_add_listener(partial(self._handle_member_update, device_id), device_id)
+            )
+
+        @callback
+        def _stop() -> None:
+            for remove in removers:
+                remove()
+
+        return _stop
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for aggregate changes; returns a remover."""
+        self._listeners[update_callback] = None
+        return lambda: self._listeners.pop(update_callback, None)
+
+    @callback
+    def _handle_member_update(self, device_id: str) -> None:
+        changed = self.aggregate.update(device_id, (self.coordinator.data or {}).get(device_id))
+        # Availability changes reach every listener without a data change
+        success = self.coordinator.last_update_success
+        if success != self._last_success:
+            self._last_success = success
+            changed = True
+        if changed and self.coordinator.needs_immediate_write(device_id):
+            self._urgent_pending = True
+        if changed and not self._notify_scheduled:
+            # Several members usually change in the same poll; notify once
+            self._notify_scheduled = True
+            self.coordinator.hass.loop.call_soon(self._notify)
+
+    @callback
+    def _notify(self) -> None:
+        self._notify_scheduled = False
+        self.urgent, self._urgent_pending = self._urgent_pending, False
+        try:
+            for update_callback in list(self._listeners):
+                update_callback()
+        finally:
+            self.urgent = False
+
+    async def async_turn_on(self) -> None:
+        await self._async_run(ACTION_CONNECT)
+
+    async def async_turn_off(self) -> None:
+        await self._async_run(ACTION_DISCONNECT)
+
+    async def async_set_volume(self, volume: int) -> None:
+        await self._async_run(ACTION_VOLUME, volume)
+
+    async def _async_run(self, action: str, volume: int | None = None) -> None:
+        """Run an action on every member, raising if any of them failed."""
+        results = await self.coordinator.async_run_batch(self.device_ids, action, volume)
+        failed = sorted(device_id for device_id, error in results.items() if error is not None)
+        if failed:
+            raise HomeAssistantError(
+                f"TuneBlade group {self.name}: {action} failed for {', '.join(failed)}"
+            )
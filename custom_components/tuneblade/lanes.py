@@ -0,0 +1,105 @@
+"""Priority lanes for requests sharing a hub's connection pool."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+
+# Times one poll may be pre-empted before it keeps its slot, so a stream of
+# commands cannot starve polling
+MAX_PREEMPTIONS = 2
+
+
+class Slot:
+    """A request's hold on one connection."""
+
+    __slots__ = ("task", "priority", "preemptions", "preempted")
+
+    def __init__(self, task: asyncio.Task | None, priority: int, preemptions: int):
+        self.task = task
+        self.priority = priority
+        self.preemptions = preemptions
+        self.preempted = False
+
+
+class RequestLanes:
+    """Hand out at most ``limit`` slots, commands before polls.
+
+    A command that finds every slot taken pre-empts a running poll: the
+    poll's task is cancelled, gives up its slot to the command and, seeing
+    ``slot.preempted``, queues again behind it. The re-run poll therefore
+    also reflects the command. A command waits only for commands queued
+    ahead of it, or for one poll that has already been pre-empted
+    MAX_PREEMPTIONS times.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._active: set[Slot] = set()
+        self._waiters: tuple[deque, deque] = (deque(), deque())
+
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._waiters)
+
+    async def acquire(self, priority: int, preemptions: int = 0) -> Slot:
+        """Wait for a slot in the given lane."""
+        while True:
+            slot = Slot(asyncio.current_task(), priority, preemptions)
+            if len(self._active) < self._limit and not any(self._waiters[: priority + 1]):
+                self._active.add(slot)
+                return slot
+
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[priority].append((future, slot))
+            if priority == PRIORITY_COMMAND:
+                self._preempt_poll()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Granted just before the cancellation landed
+                    self.release(slot)
+                    if slot.preempted and slot.task.uncancel() == 0:
+                        # Pre-empted before the poll resumed: queue again
+                        # behind the command instead of failing the poll
+                        preemptions += 1
+                        continue
+                raise
+            return slot
+
+    def release(self, slot: Slot) -> None:
+        self._active.discard(slot)
+        self._wake()
+
+    def _wake(self) -> None:
+        while len(self._active) < self._limit:
+            for queue in self._waiters:
+                while queue and queue[0][0].done():
+                    # Waiter was cancelled
+                    queue.popleft()
+                if queue:
+                    break
+            else:
+                return
+            future, slot = queue.popleft()
+            self._active.add(slot)
+            future.set_result(None)
+
+    def _preempt_poll(self) -> None:
+        for slot in self._active:
+            if (
+                slot.priority == PRIORITY_POLL
+                and not slot.preempted
+                and slot.preemptions < MAX_PREEMPTIONS
+                and slot.task is not None
+            ):
+                slot.preempted = True
+                slot.task.cancel()
+                return
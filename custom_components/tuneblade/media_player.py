@@ -4,215 +4,149 @@ from homeassistant.components.media_player.const import (
     MediaPlayerState,
     MediaPlayerEntityFeature,
 )
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.core import callback
 
 from .const import DOMAIN
+from .entity import TuneBladeEntity, TuneBladeGroupEntity
+from .parser import STATUS_DISCONNECTED, STATUS_PLAYING
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
-    added_ids = set()
-    entities = []
 
-    # Add the MASTER hub media player first if present
-    if "MASTER" in coordinator.data:
-        entities.append(TuneBladeHubMediaPlayer(coordinator))
-        added_ids.add("MASTER")
-
-    async def _update_entities():
+    @callback
+    def _add_entities(device_ids):
         new_entities = []
-
-        # Add per-device media players, skip 'MASTER' (already added)
-        for device_id, device_data in coordinator.data.items():
+        for device_id in device_ids:
+            device_data = coordinator.data[device_id]
             if device_id == "MASTER":
-                continue
-            if device_id not in added_ids:
-                entity = TuneBladeMediaPlayer(coordinator, device_id, device_data)
-                new_entities.append(entity)
-                added_ids.add(device_id)
-                _LOGGER.debug("Added new media player: %s", device_data.get("name", device_id))
-
+                new_entities.append(TuneBladeHubMediaPlayer(coordinator))
+            else:
+                new_entities.append(TuneBladeMediaPlayer(coordinator, device_id, device_data.name))
+                _LOGGER.debug("Added new media player: %s", device_data.name)
         if new_entities:
-            async_add_entities(new_entities, True)
+            async_add_entities(new_entities)
 
-    # Add initial entities
-    async_add_entities(entities)
-    await _update_entities()
+    # Add the MASTER hub media player first if present
+    _add_entities(sorted(coordinator.data, key=lambda device_id: device_id != "MASTER"))
+    async_add_entities(TuneBladeGroupMediaPlayer(group) for group in coordinator.groups.values())
 
-    # Register future additions
-    coordinator.async_add_listener(_update_entities)
+    # The coordinator reports devices that appear (or return after removal)
+    config_entry.async_on_unload(coordinator.async_add_new_devices_listener(_add_entities))
 
 
-class TuneBladeHubMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
-    """Media player representing the TuneBlade MASTER hub as a service."""
+class TuneBladeMediaPlayer(TuneBladeEntity, MediaPlayerEntity):
+    """Media player for individual TuneBlade devices."""
 
-    def __init__(self, coordinator):
-        super().__init__(coordinator)
-        self.device_id = "MASTER"
-        self._attr_name = "Master"
-        self._attr_unique_id = "tuneblade_master_media_player"
-        self._attr_volume_level = None
-        self._attr_state = MediaPlayerState.OFF
-        self._attr_supported_features = (
-            MediaPlayerEntityFeature.TURN_ON
-            | MediaPlayerEntityFeature.TURN_OFF
-            | MediaPlayerEntityFeature.VOLUME_SET
-        )
+    # Volatile or duplicated elsewhere (volume is volume_level); kept out of the recorder
+    _unrecorded_attributes = frozenset({"device_name", "status_code", "status_text", "volume"})
+    _attr_supported_features = (
+        MediaPlayerEntityFeature.TURN_ON
+        | MediaPlayerEntityFeature.TURN_OFF
+        | MediaPlayerEntityFeature.VOLUME_SET
+    )
+
+    def __init__(self, coordinator, device_id, name):
+        super().__init__(coordinator, device_id, name)
+        self._attr_name = name
+        safe_name = self._attr_name.replace(" ", "_")
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{device_id}@{safe_name}"
 
     @property
-    def available(self) -> bool:
-        return self.device_id in self.coordinator.data
+    def state(self):
+        return self.view.state
+
+    @property
+    def volume_level(self):
+        return self.view.volume_level
+
+    @property
+    def extra_state_attributes(self):
+        return self.view.attributes
 
     async def async_turn_on(self):
-        _LOGGER.debug("Connecting TuneBlade Hub MASTER")
-        await self.coordinator.client.connect(self.device_id)
-        await self.coordinator.async_request_refresh()
+        _LOGGER.debug("Connecting TuneBlade device: %s", self.name)
+        await self.coordinator.async_run_command(
+            self.device_id,
+            self.coordinator.client.connect(self.device_id),
+            status_code=STATUS_PLAYING,
+        )
 
     async def async_turn_off(self):
-        _LOGGER.debug("Disconnecting TuneBlade Hub MASTER")
-        await self.coordinator.client.disconnect(self.device_id)
-        await self.coordinator.async_request_refresh()
+        _LOGGER.debug("Disconnecting TuneBlade device: %s", self.name)
+        await self.coordinator.async_run_command(
+            self.device_id,
+            self.coordinator.client.disconnect(self.device_id),
+            status_code=STATUS_DISCONNECTED,
+        )
 
     async def async_set_volume_level(self, volume):
-        _LOGGER.debug(f"Setting volume for TuneBlade Hub MASTER: {volume}")
-        await self.coordinator.client.set_volume(self.device_id, int(volume * 100))
-        await self.coordinator.async_request_refresh()
-
-    async def async_added_to_hass(self):
-        self.coordinator.async_add_listener(self._handle_coordinator_update)
-        self._handle_coordinator_update()
-
-    def _handle_coordinator_update(self):
-        device_data = self.coordinator.data.get(self.device_id)
-        if device_data is None:
-            self._attr_state = MediaPlayerState.OFF
-            self._attr_volume_level = None
-        else:
-            code = str(device_data.get("status_code", "0"))
-            if code == "100":
-                self._attr_state = MediaPlayerState.PLAYING
-            elif code == "200":
-                self._attr_state = MediaPlayerState.IDLE
-            elif code == "0":
-                self._attr_state = MediaPlayerState.OFF
-            else:
-                self._attr_state = MediaPlayerState.OFF
-
-            volume = device_data.get("volume")
-            self._attr_volume_level = volume / 100 if volume is not None else None
+        level = int(volume * 100)
+        await self.coordinator.async_run_command(
+            self.device_id,
+            self.coordinator.client.set_volume(self.device_id, level),
+            volume=level,
+        )
 
-        self.async_write_ha_state()
 
-    @property
-    def extra_state_attributes(self):
-        device_data = self.coordinator.data.get(self.device_id, {})
-        code = str(device_data.get("status_code", "0"))
-        status_map = {
-            "0": "disconnected",
-            "100": "playing",
-            "200": "standby",
-        }
+class TuneBladeHubMediaPlayer(TuneBladeMediaPlayer):
+    """Media player representing the TuneBlade MASTER hub as a service."""
 
-        return {
-            "device_name": device_data.get("name", "MASTER"),
-            "status_code": code,
-            "status_text": status_map.get(code, "unknown"),
-            "volume": device_data.get("volume"),
-        }
+    def __init__(self, coordinator):
+        super().__init__(coordinator, "MASTER", "Master")
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}_tuneblade_master_media_player"
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {(DOMAIN, "MASTER")},
-            "name": self._attr_name,
-            "manufacturer": "TuneBlade",
-            "entry_type": "service",  # Mark as hub/service device
-        }
 
+class TuneBladeGroupMediaPlayer(TuneBladeGroupEntity, MediaPlayerEntity):
+    """Media player controlling every device of a speaker group at once."""
 
-class TuneBladeMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
-    """Media player for individual TuneBlade devices."""
+    # Counts and mean volume are recorded by the group sensors
+    _unrecorded_attributes = frozenset(
+        {"device_ids", "connected_count", "playing_count", "volume_min", "volume_max"}
+    )
+    _attr_supported_features = (
+        MediaPlayerEntityFeature.TURN_ON
+        | MediaPlayerEntityFeature.TURN_OFF
+        | MediaPlayerEntityFeature.VOLUME_SET
+    )
 
-    def __init__(self, coordinator, device_id, device_data):
-        super().__init__(coordinator)
-        self.device_id = device_id
-        self._attr_name = device_data["name"]
-        safe_name = self._attr_name.replace(" ", "_")
-        self._attr_unique_id = f"{device_id}@{safe_name}"
-        self._attr_volume_level = None
-        self._attr_state = MediaPlayerState.OFF
-        self._attr_supported_features = (
-            MediaPlayerEntityFeature.TURN_ON
-            | MediaPlayerEntityFeature.TURN_OFF
-            | MediaPlayerEntityFeature.VOLUME_SET
-        )
+    def __init__(self, group):
+        super().__init__(group)
+        self._attr_name = group.name
+        self._attr_unique_id = f"{group.coordinator.config_entry.entry_id}_group_{group.group_id}_media_player"
 
     @property
-    def available(self) -> bool:
-        return self.device_id in self.coordinator.data
-
-    async def async_turn_on(self):
-        await self.coordinator.client.connect(self.device_id)
-        await self.coordinator.async_request_refresh()
-
-    async def async_turn_off(self):
-        await self.coordinator.client.disconnect(self.device_id)
-        await self.coordinator.async_request_refresh()
-
-    async def async_set_volume_level(self, volume):
-        await self.coordinator.client.set_volume(self.device_id, int(volume * 100))
-        await self.coordinator.async_request_refresh()
-
-    async def async_added_to_hass(self):
-        """Register callback when entity is added."""
-        self.coordinator.async_add_listener(self._handle_coordinator_update)
-        self._handle_coordinator_update()
-
-    def _handle_coordinator_update(self):
-        device_data = self.coordinator.data.get(self.device_id)
-        if device_data is None:
-            self._attr_state = MediaPlayerState.OFF
-            self._attr_volume_level = None
-        else:
-            code = str(device_data.get("status_code", "0"))
-            if code == "100":
-                self._attr_state = MediaPlayerState.PLAYING
-            elif code == "200":
-                self._attr_state = MediaPlayerState.IDLE
-            elif code == "0":
-                self._attr_state = MediaPlayerState.OFF
-            else:
-                self._attr_state = MediaPlayerState.OFF
-
-            volume = device_data.get("volume")
-            self._attr_volume_level = volume / 100 if volume is not None else None
+    def state(self):
+        aggregate = self.group.aggregate
+        if aggregate.playing:
+            return MediaPlayerState.PLAYING
+        if aggregate.connected:
+            return MediaPlayerState.IDLE
+        return MediaPlayerState.OFF
 
-        self.async_write_ha_state()
+    @property
+    def volume_level(self):
+        mean = self.group.aggregate.volume_mean
+        return mean / 100 if mean is not None else None
 
     @property
     def extra_state_attributes(self):
-        device_data = self.coordinator.data.get(self.device_id, {})
-        code = str(device_data.get("status_code", "0"))
-        status_map = {
-            "0": "disconnected",
-            "100": "playing",
-            "200": "standby",
-        }
-
+        aggregate = self.group.aggregate
         return {
-            "device_name": device_data.get("name"),
-            "status_code": code,
-            "status_text": status_map.get(code, "unknown"),
-            "volume": device_data.get("volume"),
+            "device_ids": self.group.device_ids,
+            "connected_count": aggregate.connected,
+            "playing_count": aggregate.playing,
+            "volume_min": aggregate.volume_min,
+            "volume_max": aggregate.volume_max,
         }
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {(DOMAIN, self.device_id)},
-            "via_device": (DOMAIN, "MASTER"),  # Link media player to hub device
-            "name": self._attr_name,
-            "manufacturer": "TuneBlade",
-        }
+    async def async_turn_on(self):
+        await self.group.async_turn_on()
+
+    async def async_turn_off(self):
+        await self.group.async_turn_off()
+
+    async def async_set_volume_level(self, volume):
+        await self.group.async_set_volume(int(volume * 100))
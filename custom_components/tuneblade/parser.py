@@ -0,0 +1,144 @@
+"""Parser and device model for the TuneBlade ``/v2`` status response.
+
+The hub answers ``GET /v2`` with one line per AirPlay device::
+
+    <device_id> <status_code> <volume> <name ...>
+
+This module has no Home Assistant dependencies so it can be benchmarked on
+its own (see ``benchmarks/bench_parser.py``).
+"""
+from __future__ import annotations
+
+# Status codes reported by the hub
+STATUS_DISCONNECTED = 0
+STATUS_PLAYING = 100
+STATUS_STANDBY = 200
+
+STATUS_TEXT = {
+    STATUS_DISCONNECTED: "disconnected",
+    STATUS_PLAYING: "playing",
+    STATUS_STANDBY: "standby",
+}
+
+
+class TuneBladeDevice:
+    """One device line of the status response."""
+
+    __slots__ = ("id", "name", "status_code", "connected", "volume", "raw")
+
+    def __init__(
+        self,
+        device_id: str,
+        name: str,
+        status_code: int | None,
+        volume: int | None,
+        raw: bytes | None = None,
+    ):
+        self.id = device_id
+        self.name = name
+        self.status_code = status_code
+        self.connected = bool(status_code)
+        self.volume = volume
+        # Source line; None for records that did not come from the hub
+        self.raw = raw
+
+    def replace(self, **changes) -> TuneBladeDevice:
+        """Return a copy with some fields changed, e.g. for optimistic state."""
+        device = TuneBladeDevice(
+            changes.get("id", self.id),
+            changes.get("name", self.name),
+            changes.get("status_code", self.status_code),
+            changes.get("volume", self.volume),
+        )
+        if "connected" in changes:
+            device.connected = changes["connected"]
+        elif "status_code" not in changes:
+            device.connected = self.connected
+        return device
+
+    def same_state(self, other: TuneBladeDevice | None) -> bool:
+        """Return True if the user-visible fields match."""
+        return other is self or (
+            other is not None
+            and self.connected == other.connected
+            and self.volume == other.volume
+            and self.status_code == other.status_code
+            and self.name == other.name
+        )
+
+    def as_dict(self) -> dict:
+        """Return the record as a plain dict for logging and diagnostics."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "connected": self.connected,
+            "volume": self.volume,
+            "status_code": self.status_code,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"TuneBladeDevice({self.id!r}, {self.name!r}, status_code={self.status_code}, "
+            f"volume={self.volume})"
+        )
+
+
+def parse_line(line: bytes) -> TuneBladeDevice | None:
+    """Parse one status line, returning None if it is malformed."""
+    parts = line.split(None, 3)
+    if len(parts) < 3:
+        return None
+
+    device_id = parts[0].decode("ascii", "replace")
+    try:
+        status_code = int(parts[1])
+    except ValueError:
+        status_code = None
+    try:
+        volume = int(parts[2])
+    except ValueError:
+        volume = None
+    if len(parts) > 3:
+        name = parts[3].decode("utf-8", "replace").strip()
+        if "  " in name or "\t" in name:
+            name = " ".join(name.split())
+    else:
+        name = device_id
+
+    return TuneBladeDevice(device_id, name, status_code, volume, line)
+
+
+class StatusParser:
+    """Parse status responses, reusing records for lines that did not change.
+
+    Records are keyed by their raw line, so an unchanged device costs one
+    dict lookup per poll and keeps its identity across snapshots.
+    """
+
+    def __init__(self) -> None:
+        self._by_line: dict[bytes, TuneBladeDevice] = {}
+
+    def parse(self, body: bytes) -> dict[str, TuneBladeDevice]:
+        """Return device_id -> record for a raw ``/v2`` body."""
+        previous = self._by_line
+        by_line: dict[bytes, TuneBladeDevice] = {}
+        devices: dict[str, TuneBladeDevice] = {}
+
+        for line in body.splitlines():
+            device = previous.get(line)
+            if device is None:
+                line = line.strip()
+                if not line:
+                    continue
+                device = previous.get(line) or parse_line(line)
+                if device is None:
+                    continue
+            by_line[line] = device
+            devices[device.id] = device
+
+        self._by_line = by_line
+        return devices
+
+    def reset(self) -> None:
+        """Forget the previous snapshot."""
+        self._by_line = {}
@@ -0,0 +1,63 @@
+"""cProfile capture of TuneBlade poll cycles."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+_PROFILING = f"{__name__}_running"
+
+
+async def async_profile_polls(hass: HomeAssistant, coordinators: list, polls: int, top: int) -> dict:
+    """Profile the event loop while every hub polls `polls` times.
+
+    Each cycle refreshes all hubs at once, so the profile covers fetching,
+    parsing, dispatch and the entity state writes it triggers. Writes a
+    .pstats file and a text summary of the top functions by cumulative time
+    to the config directory and returns their paths.
+    """
+    if hass.data.get(_PROFILING):
+        raise HomeAssistantError("A TuneBlade profile is already running")
+    hass.data[_PROFILING] = True
+    profiler = cProfile.Profile()
+    try:
+        try:
+            profiler.enable()
+        except ValueError as err:
+            # Another profiler (e.g. the profiler integration) is active
+            raise HomeAssistantError(f"Cannot start profiling: {err}") from err
+        start = time.perf_counter()
+        try:
+            for _ in range(polls):
+                await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+    finally:
+        hass.data.pop(_PROFILING, None)
+
+    stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+    stats_path = hass.config.path(f"tuneblade_profile_{stamp}.pstats")
+    summary_path = hass.config.path(f"tuneblade_profile_{stamp}.txt")
+    header = f"TuneBlade profile: {polls} poll cycles of {len(coordinators)} hub(s) in {elapsed:.3f}s\n\n"
+    await hass.async_add_executor_job(_write_results, profiler, stats_path, summary_path, header, top)
+    _LOGGER.info("Wrote TuneBlade profile to %s and %s", stats_path, summary_path)
+    return {"pstats": stats_path, "summary": summary_path, "seconds": round(elapsed, 3)}
+
+
+def _write_results(profiler: cProfile.Profile, stats_path: str, summary_path: str, header: str, top: int) -> None:
+    profiler.dump_stats(stats_path)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    with open(summary_path, "w", encoding="utf-8") as summary:
+        summary.write(header)
+        summary.write(stream.getvalue())
@@ -0,0 +1,117 @@
+"""Rate-limited volume ramp (fade) engine for the TuneBlade API client."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# Volume steps per second sent to one device during a ramp
+RAMP_STEP_RATE = 2.0
+# Ramp requests per second allowed to one hub across all ramping devices
+RAMP_MAX_RATE = 10.0
+
+CURVE_LINEAR = "linear"
+CURVE_EASE_IN = "ease_in"
+CURVE_EASE_OUT = "ease_out"
+CURVE_EASE_IN_OUT = "ease_in_out"
+
+CURVES: dict[str, Callable[[float], float]] = {
+    CURVE_LINEAR: lambda x: x,
+    CURVE_EASE_IN: lambda x: x * x,
+    CURVE_EASE_OUT: lambda x: 1 - (1 - x) * (1 - x),
+    CURVE_EASE_IN_OUT: lambda x: x * x * (3 - 2 * x),
+}
+
+
+def ramp_plan(
+    start: int, target: int, duration: float, curve: str = CURVE_LINEAR, step_rate: float = RAMP_STEP_RATE
+) -> list[tuple[float, int]]:
+    """Return (seconds from start, volume) steps from start to target.
+
+    Never plans more steps than there are distinct volumes to pass through,
+    and skips steps the curve rounds to the previous volume.
+    """
+    distance = abs(target - start)
+    if distance == 0 or duration <= 0:
+        return [(0.0, target)]
+
+    shape = CURVES[curve]
+    steps = max(1, min(distance, int(duration * step_rate)))
+    plan = []
+    last = start
+    for index in range(1, steps + 1):
+        fraction = index / steps
+        volume = round(start + (target - start) * shape(fraction))
+        if volume != last:
+            plan.append((duration * fraction, volume))
+            last = volume
+    if last != target:
+        plan.append((duration, target))
+    return plan
+
+
+class RateLimiter:
+    """Space acquisitions at least 1/rate seconds apart, first come first served."""
+
+    def __init__(self, rate: float):
+        self._interval = 1 / rate
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        wait = self._next - now
+        self._next = max(now, self._next) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class VolumeRampEngine:
+    """Run at most one volume ramp per device under a shared per-hub rate cap."""
+
+    def __init__(self, set_volume: Callable[[str, int], Awaitable[None]], max_rate: float = RAMP_MAX_RATE):
+        self._set_volume = set_volume
+        self._limiter = RateLimiter(max_rate)
+        self._ramps: dict[str, asyncio.Task] = {}
+
+    def is_ramping(self, device_id: str) -> bool:
+        return device_id in self._ramps
+
+    def start(self, device_id: str, start: int, target: int, duration: float, curve: str) -> asyncio.Task:
+        """Start a ramp, replacing any ramp already running on the device."""
+        self.cancel(device_id)
+        plan = ramp_plan(start, target, duration, curve)
+        task = asyncio.get_running_loop().create_task(self._run(device_id, plan))
+        self._ramps[device_id] = task
+
+        def _done(finished: asyncio.Task) -> None:
+            if self._ramps.get(device_id) is finished:
+                del self._ramps[device_id]
+
+        task.add_done_callback(_done)
+        _LOGGER.debug("Ramping %s from %s to %s over %ss in %s steps", device_id, start, target, duration, len(plan))
+        return task
+
+    def cancel(self, device_id: str) -> bool:
+        """Cancel the device's ramp; returns True if one was running."""
+        task = self._ramps.pop(device_id, None)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def cancel_all(self) -> None:
+        for device_id in list(self._ramps):
+            self.cancel(device_id)
+
+    async def _run(self, device_id: str, plan: list[tuple[float, int]]) -> None:
+        loop = asyncio.get_running_loop()
+        began = loop.time()
+        for offset, volume in plan:
+            delay = began + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._limiter.acquire()
+            await self._set_volume(device_id, volume)
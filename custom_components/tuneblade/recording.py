@@ -0,0 +1,94 @@
+"""Record hub traffic to a trace file (replayed by ``replay.py``).
+
+A trace is a gzip stream starting with ``MAGIC`` followed by records of::
+
+    <offset: float64> <kind: uint8> <path length: uint16> <payload length: uint32> <path> <payload>
+
+``offset`` is seconds since recording started and ``path`` is the URL
+relative to ``/v2`` (empty for the status of every device). Records are
+buffered and appended as gzip members off the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import struct
+import time
+from typing import Iterator, NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"TBTRACE1"
+_HEADER = struct.Struct("<dBHI")
+
+# What a record holds
+RECORD_RESPONSE = 1
+RECORD_NOT_MODIFIED = 2
+RECORD_COMMAND = 3
+
+# Buffered bytes that trigger a write
+FLUSH_SIZE = 64 * 1024
+
+
+class TraceEvent(NamedTuple):
+    offset: float
+    kind: int
+    path: str
+    payload: bytes
+
+
+class TraceRecorder:
+    """Append hub responses and commands to a trace file."""
+
+    def __init__(self, path: str, flush_size: int = FLUSH_SIZE):
+        self.path = path
+        self.records = 0
+        self._flush_size = flush_size
+        self._start = time.monotonic()
+        self._buffer = bytearray(MAGIC)
+        self._pending: asyncio.Future | None = None
+
+    def record(self, kind: int, path: str, payload: bytes = b"") -> None:
+        encoded = path.encode()
+        self._buffer += _HEADER.pack(time.monotonic() - self._start, kind, len(encoded), len(payload))
+        self._buffer += encoded
+        self._buffer += payload
+        self.records += 1
+        if len(self._buffer) >= self._flush_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        # Chain writes so chunks land in the order they were recorded
+        self._pending = asyncio.ensure_future(self._async_write(self._pending, chunk))
+
+    async def _async_write(self, previous: asyncio.Future | None, chunk: bytes) -> None:
+        if previous is not None:
+            await previous
+        await asyncio.get_running_loop().run_in_executor(None, self._write, chunk)
+
+    def _write(self, chunk: bytes) -> None:
+        with gzip.open(self.path, "ab") as trace:
+            trace.write(chunk)
+
+    async def async_close(self) -> None:
+        """Write everything recorded so far."""
+        if self._buffer:
+            self._flush()
+        if self._pending is not None:
+            await self._pending
+            self._pending = None
+        _LOGGER.debug("Recorded %s TuneBlade trace records to %s", self.records, self.path)
+
+
+def read_trace(path: str) -> Iterator[TraceEvent]:
+    """Yield the events of a trace file in recorded order."""
+    with gzip.open(path, "rb") as trace:
+        if trace.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a TuneBlade trace")
+        while header := trace.read(_HEADER.size):
+            offset, kind, path_length, payload_length = _HEADER.unpack(header)
+            event_path = trace.read(path_length).decode()
+            yield TraceEvent(offset, kind, event_path, trace.read(payload_length))
@@ -0,0 +1,57 @@
+"""Replay a recorded trace through the API client without a hub."""
+from __future__ import annotations
+
+import asyncio
+
+from .recording import RECORD_COMMAND, RECORD_NOT_MODIFIED, TraceEvent
+from .tuneblade import TuneBladeApiClient
+
+
+class ReplayApiClient(TuneBladeApiClient):
+    """API client answering from a recorded trace instead of a hub.
+
+    Every fetch returns the next recorded response, so a coordinator using
+    this client runs its real parse, diff and dispatch path. With
+    ``realtime`` responses are held back to their recorded offsets (divided
+    by ``speed``); otherwise they are served as fast as they are asked for.
+    Commands are counted and dropped.
+    """
+
+    def __init__(self, events: list[TraceEvent], realtime: bool = False, speed: float = 1.0):
+        super().__init__("replay", 0)
+        # Full status polls drive the replay; per-device reads are answered from them
+        self._events = [event for event in events if event.kind != RECORD_COMMAND and not event.path]
+        self._position = 0
+        self._realtime = realtime
+        self._speed = speed
+        self._started: float | None = None
+        self.recorded_commands = sum(1 for event in events if event.kind == RECORD_COMMAND)
+        self.replayed_commands = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self._position >= len(self._events)
+
+    async def _fetch(self, url: str, headers: dict[str, str] | None = None) -> tuple[bytes | None, dict[str, str]]:
+        if self.exhausted:
+            raise EOFError("End of TuneBlade trace")
+        event = self._events[self._position]
+        self._position += 1
+        loop = asyncio.get_running_loop()
+        if self._started is None:
+            self._started = loop.time() - event.offset / self._speed
+        if self._realtime:
+            delay = self._started + event.offset / self._speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if event.kind == RECORD_NOT_MODIFIED:
+            return None, {}
+        return event.payload, {}
+
+    async def async_get_device(self, device_id: str):
+        # Per-device reads come from the last replayed snapshot, so they do
+        # not consume trace events meant for full polls
+        return (self._last_devices or {}).get(device_id)
+
+    async def _send_command(self, url: str, description: str):
+        self.replayed_commands += 1
@@ -0,0 +1,105 @@
+"""Domain-wide poll scheduler shared by every TuneBlade hub."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import TuneBladeDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Hub status fetches allowed to run at the same time across all entries
+MAX_CONCURRENT_FETCHES = 2
+
+
+class TuneBladePollScheduler:
+    """Stagger hub polls evenly across their interval and cap concurrent fetches.
+
+    Every registered hub gets a phase (its index over the number of hubs). A
+    hub's next poll lands on that phase of its own interval, so N hubs on the
+    same interval are spread 1/N of an interval apart instead of firing
+    together.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrent_fetches: int = MAX_CONCURRENT_FETCHES):
+        self.hass = hass
+        self.fetch_limiter = asyncio.Semaphore(max_concurrent_fetches)
+        self._hubs: list[TuneBladeDataUpdateCoordinator] = []
+        self._timers: dict[TuneBladeDataUpdateCoordinator, asyncio.TimerHandle] = {}
+        self._polling: set[TuneBladeDataUpdateCoordinator] = set()
+
+    @property
+    def hub_count(self) -> int:
+        return len(self._hubs)
+
+    @callback
+    def async_register(self, coordinator: TuneBladeDataUpdateCoordinator) -> CALLBACK_TYPE:
+        """Take over periodic polling of a hub; returns a callback to release it."""
+        self._hubs.append(coordinator)
+        coordinator.async_attach_scheduler(self)
+        self._async_rebalance()
+
+        @callback
+        def _unregister() -> None:
+            self._cancel_timer(coordinator)
+            if coordinator in self._hubs:
+                self._hubs.remove(coordinator)
+            coordinator.async_attach_scheduler(None)
+            self._async_rebalance()
+
+        return _unregister
+
+    @callback
+    def async_reschedule(self, coordinator: TuneBladeDataUpdateCoordinator) -> None:
+        """Schedule the hub's next poll on its phase of its current interval."""
+        self._cancel_timer(coordinator)
+        if coordinator not in self._hubs:
+            return
+        entry = coordinator.config_entry
+        if entry is not None and entry.pref_disable_polling:
+            return
+
+        interval = coordinator.poll_interval.total_seconds()
+        phase = self._hubs.index(coordinator) / len(self._hubs) * interval
+        loop = self.hass.loop
+        # Earliest acceptable time is half an interval away, so rebalancing
+        # never polls a hub twice in quick succession
+        earliest = loop.time() + interval / 2
+        when = earliest - (earliest % interval) + phase
+        if when < earliest:
+            when += interval
+        self._timers[coordinator] = loop.call_at(when, self._fire, coordinator)
+
+    @callback
+    def _async_rebalance(self) -> None:
+        for coordinator in self._hubs:
+            self.async_reschedule(coordinator)
+
+    def _cancel_timer(self, coordinator: TuneBladeDataUpdateCoordinator) -> None:
+        timer = self._timers.pop(coordinator, None)
+        if timer is not None:
+            timer.cancel()
+
+    @callback
+    def _fire(self, coordinator: TuneBladeDataUpdateCoordinator) -> None:
+        self._timers.pop(coordinator, None)
+        if coordinator in self._polling or self.hass.is_stopping:
+            return
+        self._polling.add(coordinator)
+        self.hass.async_create_background_task(
+            self._async_poll(coordinator), f"{DOMAIN} poll {coordinator.name}"
+        )
+
+    async def _async_poll(self, coordinator: TuneBladeDataUpdateCoordinator) -> None:
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._polling.discard(coordinator)
+            if coordinator not in self._timers:
+                self.async_reschedule(coordinator)
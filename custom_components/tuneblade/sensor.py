@@ -0,0 +1,169 @@
+"""Diagnostic hub sensors and speaker group aggregate sensors for TuneBlade."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfInformation, UnitOfTime
+
+from .const import DOMAIN
+from .entity import TuneBladeGroupEntity, hub_device_info
+from .group import GroupAggregate
+from .stats import HubStats
+
+SCAN_INTERVAL = timedelta(seconds=60)
+PARALLEL_UPDATES = 0
+
+
+@dataclass(frozen=True, kw_only=True)
+class TuneBladeSensorEntityDescription(SensorEntityDescription):
+    """Describes a TuneBlade statistics sensor."""
+
+    value_fn: Callable[[HubStats], float | None]
+
+
+def _ms(value: float | None) -> float | None:
+    return round(value, 2) if value is not None else None
+
+
+SENSORS: tuple[TuneBladeSensorEntityDescription, ...] = (
+    TuneBladeSensorEntityDescription(
+        key="poll_rtt_p50",
+        name="Poll round trip p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda stats: _ms(stats.poll_rtt.percentile(50)),
+    ),
+    TuneBladeSensorEntityDescription(
+        key="poll_rtt_p99",
+        name="Poll round trip p99",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda stats: _ms(stats.poll_rtt.percentile(99)),
+    ),
+    TuneBladeSensorEntityDescription(
+        key="body_size",
+        name="Status response size",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        value_fn=lambda stats: stats.body_size.last,
+    ),
+    TuneBladeSensorEntityDescription(
+        key="parse_time_p50",
+        name="Parse time p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda stats: _ms(stats.parse_time.percentile(50)),
+    ),
+    TuneBladeSensorEntityDescription(
+        key="command_latency_p50",
+        name="Command latency p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda stats: _ms(stats.command_latency.percentile(50)),
+    ),
+    TuneBladeSensorEntityDescription(
+        key="command_latency_p99",
+        name="Command latency p99",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda stats: _ms(stats.command_latency.percentile(99)),
+    ),
+    TuneBladeSensorEntityDescription(
+        key="command_wait_p99",
+        name="Command wait p99",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda stats: _ms(stats.command_wait.percentile(99)),
+    ),
+    TuneBladeSensorEntityDescription(
+        key="poll_cache_hit_ratio",
+        name="Unchanged polls",
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda stats: stats.poll_cache_hit_ratio,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class TuneBladeGroupSensorEntityDescription(SensorEntityDescription):
+    """Describes a speaker group aggregate sensor."""
+
+    value_fn: Callable[[GroupAggregate], float | None]
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 1) if value is not None else None
+
+
+GROUP_SENSORS: tuple[TuneBladeGroupSensorEntityDescription, ...] = (
+    TuneBladeGroupSensorEntityDescription(
+        key="connected",
+        name="Connected speakers",
+        value_fn=lambda aggregate: aggregate.connected,
+    ),
+    TuneBladeGroupSensorEntityDescription(
+        key="playing",
+        name="Playing speakers",
+        value_fn=lambda aggregate: aggregate.playing,
+    ),
+    TuneBladeGroupSensorEntityDescription(
+        key="volume_mean",
+        name="Mean volume",
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda aggregate: _round(aggregate.volume_mean),
+    ),
+)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    entities: list[SensorEntity] = [
+        TuneBladeStatsSensor(coordinator, entry, description) for description in SENSORS
+    ]
+    entities.extend(
+        TuneBladeGroupSensor(group, description)
+        for group in coordinator.groups.values()
+        for description in GROUP_SENSORS
+    )
+    async_add_entities(entities)
+
+
+class TuneBladeStatsSensor(SensorEntity):
+    """Rolling hub statistic attached to the hub device.
+
+    The statistics change on every poll, so these sensors sample them on their
+    own slower interval instead of listening to the coordinator.
+    """
+
+    entity_description: TuneBladeSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_should_poll = True
+
+    def __init__(self, coordinator, entry, description: TuneBladeSensorEntityDescription):
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = hub_device_info(entry.entry_id)
+
+    @property
+    def native_value(self) -> float | None:
+        return self.entity_description.value_fn(self.coordinator.client.stats)
+
+
+class TuneBladeGroupSensor(TuneBladeGroupEntity, SensorEntity):
+    """Aggregate of a speaker group, written only when the aggregate changes."""
+
+    entity_description: TuneBladeGroupSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, group, description: TuneBladeGroupSensorEntityDescription):
+        super().__init__(group)
+        self.entity_description = description
+        self._attr_unique_id = f"{group.coordinator.config_entry.entry_id}_group_{group.group_id}_{description.key}"
+
+    @property
+    def native_value(self) -> float | None:
+        return self.entity_description.value_fn(self.group.aggregate)
@@ -0,0 +1,308 @@
+"""Services for the TuneBlade integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import (
+    ATTR_ACTION,
+    ATTR_CURVE,
+    ATTR_DEVICE_IDS,
+    ATTR_DURATION,
+    ATTR_ENABLED,
+    ATTR_MAX_CONCURRENCY,
+    ATTR_NAME,
+    ATTR_POLLS,
+    ATTR_TOP,
+    ATTR_VOLUME_LEVEL,
+    DOMAIN,
+    SERVICE_BULK_COMMAND,
+    SERVICE_PROFILE,
+    SERVICE_RECORD,
+    SERVICE_RESTORE,
+    SERVICE_SNAPSHOT,
+    SERVICE_TIMING_SPANS,
+    SERVICE_VOLUME_RAMP,
+)
+from .profiling import async_profile_polls
+from .ramp import CURVE_LINEAR, CURVES
+from .recording import TraceRecorder
+from .snapshots import DATA_SNAPSHOTS, async_get_snapshot_store
+from .tuneblade import ACTION_VOLUME, BATCH_ACTIONS, BATCH_CONCURRENCY
+
+_LOGGER = logging.getLogger(__name__)
+
+BULK_COMMAND_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_IDS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_ACTION): vol.In(BATCH_ACTIONS),
+        vol.Optional(ATTR_VOLUME_LEVEL): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional(ATTR_MAX_CONCURRENCY, default=BATCH_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=64)
+        ),
+    }
+)
+
+VOLUME_RAMP_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_IDS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_VOLUME_LEVEL): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Required(ATTR_DURATION): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+        vol.Optional(ATTR_CURVE, default=CURVE_LINEAR): vol.In(list(CURVES)),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_POLLS, default=10): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+        vol.Optional(ATTR_TOP, default=40): vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+    }
+)
+
+TIMING_SPANS_SCHEMA = vol.Schema({vol.Required(ATTR_ENABLED): cv.boolean})
+
+RECORD_SCHEMA = vol.Schema({vol.Required(ATTR_ENABLED): cv.boolean})
+
+SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_DEVICE_IDS): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+RESTORE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_MAX_CONCURRENCY, default=BATCH_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=64)
+        ),
+    }
+)
+
+
+def _coordinators_for(hass: HomeAssistant, device_ids: list[str]):
+    """Group device IDs by the coordinator of the hub that reports them.
+
+    A speaker reported by several hubs goes to the hub it is connected to,
+    otherwise to the hub that was added first.
+    """
+    grouped = {}
+    unknown = []
+    loaded = hass.data.get(DOMAIN, {})
+    coordinators = [
+        loaded[entry.entry_id] for entry in hass.config_entries.async_entries(DOMAIN) if entry.entry_id in loaded
+    ]
+    for device_id in dict.fromkeys(device_ids):
+        reporting = [coordinator for coordinator in coordinators if device_id in (coordinator.data or {})]
+        if not reporting:
+            unknown.append(device_id)
+            continue
+        coordinator = next(
+            (coordinator for coordinator in reporting if coordinator.data[device_id].connected), reporting[0]
+        )
+        grouped.setdefault(coordinator, []).append(device_id)
+    return grouped, unknown
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the TuneBlade services once for all config entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_BULK_COMMAND):
+        return
+
+    async def _async_bulk_command(call: ServiceCall) -> ServiceResponse:
+        action = call.data[ATTR_ACTION]
+        volume = None
+        if action == ACTION_VOLUME:
+            if ATTR_VOLUME_LEVEL not in call.data:
+                raise ServiceValidationError("volume_level is required for the volume action")
+            volume = int(call.data[ATTR_VOLUME_LEVEL] * 100)
+
+        grouped, unknown = _coordinators_for(hass, call.data[ATTR_DEVICE_IDS])
+        batches = await asyncio.gather(
+            *(
+                coordinator.async_run_batch(
+                    device_ids, action, volume, call.data[ATTR_MAX_CONCURRENCY]
+                )
+                for coordinator, device_ids in grouped.items()
+            )
+        )
+
+        results = {device_id: "unknown_device" for device_id in unknown}
+        for batch in batches:
+            results.update(batch)
+        _LOGGER.debug("Bulk %s results: %s", action, results)
+        return {
+            "results": {
+                device_id: {"success": error is None, "error": error}
+                for device_id, error in results.items()
+            }
+        }
+
+    async def _async_volume_ramp(call: ServiceCall) -> None:
+        grouped, unknown = _coordinators_for(hass, call.data[ATTR_DEVICE_IDS])
+        if unknown:
+            _LOGGER.warning("Cannot ramp unknown TuneBlade devices: %s", ", ".join(unknown))
+        target = int(call.data[ATTR_VOLUME_LEVEL] * 100)
+        for coordinator, device_ids in grouped.items():
+            coordinator.async_start_ramp(device_ids, target, call.data[ATTR_DURATION], call.data[ATTR_CURVE])
+
+    async def _async_profile(call: ServiceCall) -> ServiceResponse:
+        coordinators = list(hass.data.get(DOMAIN, {}).values())
+        if not coordinators:
+            raise ServiceValidationError("No TuneBlade hub is loaded")
+        return await async_profile_polls(hass, coordinators, call.data[ATTR_POLLS], call.data[ATTR_TOP])
+
+    async def _async_timing_spans(call: ServiceCall) -> ServiceResponse:
+        hubs = {}
+        for coordinator in hass.data.get(DOMAIN, {}).values():
+            stats = coordinator.client.stats
+            # Report what the last run recorded before switching
+            hubs[coordinator.config_entry.entry_id] = {
+                "title": coordinator.config_entry.title,
+                "stages": stats.stages_as_dict(),
+            }
+            stats.spans_enabled = call.data[ATTR_ENABLED]
+            if stats.spans_enabled:
+                for stage in stats.stages.values():
+                    stage.reset()
+        return {"hubs": hubs}
+
+    async def _async_record(call: ServiceCall) -> ServiceResponse:
+        stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+        traces = {}
+        for coordinator in hass.data.get(DOMAIN, {}).values():
+            client = coordinator.client
+            entry = coordinator.config_entry
+            if call.data[ATTR_ENABLED]:
+                if client.recorder is None:
+                    client.recorder = TraceRecorder(
+                        hass.config.path(f"tuneblade_trace_{slugify(entry.title)}_{stamp}.tbt")
+                    )
+                traces[entry.entry_id] = {"path": client.recorder.path, "records": client.recorder.records}
+            elif client.recorder is not None:
+                recorder, client.recorder = client.recorder, None
+                await recorder.async_close()
+                traces[entry.entry_id] = {"path": recorder.path, "records": recorder.records}
+        return {"traces": traces}
+
+    async def _async_snapshot(call: ServiceCall) -> ServiceResponse:
+        devices = {}
+        if ATTR_DEVICE_IDS in call.data:
+            grouped, unknown = _coordinators_for(hass, call.data[ATTR_DEVICE_IDS])
+            if unknown:
+                raise ServiceValidationError(f"Unknown TuneBlade devices: {', '.join(unknown)}")
+            for coordinator, device_ids in grouped.items():
+                devices.update(coordinator.snapshot_states(device_ids))
+        else:
+            for coordinator in hass.data.get(DOMAIN, {}).values():
+                devices.update(coordinator.snapshot_states())
+        if not devices:
+            raise ServiceValidationError("No TuneBlade devices to snapshot")
+        return await async_get_snapshot_store(hass).async_save(call.data[ATTR_NAME], devices)
+
+    async def _async_restore(call: ServiceCall) -> ServiceResponse:
+        name = call.data[ATTR_NAME]
+        snapshot = await async_get_snapshot_store(hass).async_get(name)
+        if snapshot is None:
+            raise ServiceValidationError(f"No TuneBlade snapshot named {name}")
+        states = snapshot["devices"]
+        grouped, unknown = _coordinators_for(hass, states)
+
+        plans = {}
+        for coordinator, device_ids in grouped.items():
+            commands, missing = coordinator.plan_states({device_id: states[device_id] for device_id in device_ids})
+            unknown.extend(missing)
+            if commands:
+                plans[coordinator] = commands
+        outcomes = await asyncio.gather(
+            *(
+                coordinator.async_run_commands(commands, call.data[ATTR_MAX_CONCURRENCY])
+                for coordinator, commands in plans.items()
+            )
+        )
+
+        results = {device_id: {"commands": [], "error": "unknown_device"} for device_id in unknown}
+        for device_ids in grouped.values():
+            for device_id in device_ids:
+                results.setdefault(device_id, {"commands": [], "error": None})
+        for commands in plans.values():
+            for device_id, action, _ in commands:
+                results[device_id]["commands"].append(action)
+        for outcome in outcomes:
+            for device_id, error in outcome.items():
+                results[device_id]["error"] = error
+        _LOGGER.debug("Restored TuneBlade snapshot %s: %s", name, results)
+        return {
+            "commands": sum(len(commands) for commands in plans.values()),
+            "results": results,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SNAPSHOT,
+        _async_snapshot,
+        schema=SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTORE,
+        _async_restore,
+        schema=RESTORE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_VOLUME_RAMP, _async_volume_ramp, schema=VOLUME_RAMP_SCHEMA
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD,
+        _async_record,
+        schema=RECORD_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_TIMING_SPANS,
+        _async_timing_spans,
+        schema=TIMING_SPANS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_COMMAND,
+        _async_bulk_command,
+        schema=BULK_COMMAND_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the TuneBlade services when the last entry is unloaded."""
+    hass.services.async_remove(DOMAIN, SERVICE_BULK_COMMAND)
+    hass.services.async_remove(DOMAIN, SERVICE_VOLUME_RAMP)
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_TIMING_SPANS)
+    hass.services.async_remove(DOMAIN, SERVICE_RECORD)
+    hass.services.async_remove(DOMAIN, SERVICE_SNAPSHOT)
+    hass.services.async_remove(DOMAIN, SERVICE_RESTORE)
+    hass.data.pop(DATA_SNAPSHOTS, None)
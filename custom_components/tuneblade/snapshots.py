@@ -0,0 +1,44 @@
+"""Named snapshots of speaker states, kept across restarts."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, STORAGE_VERSION
+
+DATA_SNAPSHOTS = f"{DOMAIN}_snapshots"
+
+
+class SnapshotStore:
+    """Snapshots of device connection and volume, by name.
+
+    Stored as ``{"snapshots": {name: {"created": ..., "devices": {id: state}}}}``
+    where a state holds the device's name, connected flag and volume.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.snapshots")
+        self._snapshots: dict[str, dict] | None = None
+
+    async def async_load(self) -> dict[str, dict]:
+        if self._snapshots is None:
+            data = await self._store.async_load() or {}
+            self._snapshots = data.get("snapshots", {})
+        return self._snapshots
+
+    async def async_get(self, name: str) -> dict | None:
+        return (await self.async_load()).get(name)
+
+    async def async_save(self, name: str, devices: dict[str, dict]) -> dict:
+        snapshots = await self.async_load()
+        snapshot = snapshots[name] = {"created": dt_util.utcnow().isoformat(), "devices": devices}
+        await self._store.async_save({"snapshots": snapshots})
+        return snapshot
+
+
+def async_get_snapshot_store(hass: HomeAssistant) -> SnapshotStore:
+    """Return the shared snapshot store, creating it on first use."""
+    if DATA_SNAPSHOTS not in hass.data:
+        hass.data[DATA_SNAPSHOTS] = SnapshotStore(hass)
+    return hass.data[DATA_SNAPSHOTS]
@@ -0,0 +1,126 @@
+"""Rolling hot-path statistics for the TuneBlade client and coordinator."""
+from __future__ import annotations
+
+import contextlib
+import time
+from collections import deque
+
+# Samples kept per metric
+WINDOW = 256
+
+# Stages of a poll that can be timed at runtime
+STAGES = ("fetch", "parse", "diff", "dispatch", "state_write")
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class RollingStats:
+    """Keep the last WINDOW samples of a metric and report percentiles."""
+
+    __slots__ = ("_samples", "count", "last")
+
+    def __init__(self, window: int = WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.last: float | None = None
+
+    def add(self, value: float) -> None:
+        """Record one sample."""
+        self._samples.append(value)
+        self.count += 1
+        self.last = value
+
+    def reset(self) -> None:
+        """Forget every sample."""
+        self._samples.clear()
+        self.count = 0
+        self.last = None
+
+    def percentile(self, pct: float) -> float | None:
+        """Return the pct-th percentile (0-100) of the window, or None if empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def as_dict(self) -> dict:
+        """Summarise the window for diagnostics."""
+        return {
+            "count": self.count,
+            "last": self.last,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": max(self._samples) if self._samples else None,
+        }
+
+
+class _Span:
+    """Add the milliseconds spent inside a with block to a RollingStats."""
+
+    __slots__ = ("_stats", "_start")
+
+    def __init__(self, stats: RollingStats):
+        self._stats = stats
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self._stats.add((time.perf_counter() - self._start) * 1000)
+
+
+class HubStats:
+    """Metrics recorded for one hub."""
+
+    def __init__(self) -> None:
+        # Milliseconds for the /v2 request, from send to body read
+        self.poll_rtt = RollingStats()
+        # Size of the /v2 body in bytes
+        self.body_size = RollingStats()
+        # Milliseconds spent parsing the /v2 body
+        self.parse_time = RollingStats()
+        # Milliseconds from queueing a command to its completion
+        self.command_latency = RollingStats()
+        # Milliseconds a command waited for a connection slot
+        self.command_wait = RollingStats()
+        # Milliseconds for a full coordinator update (fetch, parse and diff)
+        self.update_time = RollingStats()
+        # /v2 polls whose body matched the previous one (or 304) and polls that did not
+        self.poll_cache_hits = 0
+        self.poll_cache_misses = 0
+        # Polls restarted to let a command through first
+        self.polls_preempted = 0
+        # Entity state writes held back because only attributes changed
+        self.writes_deferred = 0
+        # Per-stage milliseconds, only recorded while spans are enabled
+        self.spans_enabled = False
+        self.stages = {stage: RollingStats() for stage in STAGES}
+
+    def span(self, stage: str):
+        """Time a with block as one sample of a stage; free while spans are disabled."""
+        if not self.spans_enabled:
+            return _NO_SPAN
+        return _Span(self.stages[stage])
+
+    @property
+    def poll_cache_hit_ratio(self) -> float | None:
+        """Percentage of polls answered without parsing."""
+        total = self.poll_cache_hits + self.poll_cache_misses
+        return round(100 * self.poll_cache_hits / total, 1) if total else None
+
+    def as_dict(self) -> dict:
+        """Summarise every metric for diagnostics."""
+        summary = {
+            name: value.as_dict() if isinstance(value, RollingStats) else value
+            for name, value in vars(self).items()
+        }
+        summary["stages"] = self.stages_as_dict()
+        summary["poll_cache_hit_ratio"] = self.poll_cache_hit_ratio
+        return summary
+
+    def stages_as_dict(self) -> dict:
+        """Summarise the stage spans recorded so far."""
+        return {stage: stats.as_dict() for stage, stats in self.stages.items() if stats.count}
@@ -1,79 +1,397 @@
+import asyncio
+import hashlib
 import logging
-from aiohttp import ClientSession, ClientResponseError
+import random
+import time
+from aiohttp import ClientResponseError, ClientSession, ClientTimeout, TCPConnector, hdrs
+
+from .breaker import CircuitBreaker
+from .command_queue import KIND_STATUS, KIND_VOLUME, DeviceCommandQueue
+from .lanes import PRIORITY_COMMAND, PRIORITY_POLL, RequestLanes
+from .parser import StatusParser, TuneBladeDevice, parse_line
+from .ramp import VolumeRampEngine
+from .recording import RECORD_COMMAND, RECORD_NOT_MODIFIED, RECORD_RESPONSE, TraceRecorder
+from .stats import HubStats
 
 _LOGGER = logging.getLogger(__name__)
 
+# Minimum spacing between two commands sent to the same device
+COMMAND_INTERVAL = 0.2
+# Default number of devices a batch command talks to at once
+BATCH_CONCURRENCY = 8
+
+# Connections kept open to one hub; the hub is often a small machine on Wi-Fi
+POOL_SIZE = 4
+KEEPALIVE_TIMEOUT = 60
+CONNECT_TIMEOUT = 5
+# Read timeouts: a status poll may be slow on big hubs, commands should not be
+POLL_TIMEOUT = ClientTimeout(total=None, connect=CONNECT_TIMEOUT, sock_read=10)
+COMMAND_TIMEOUT = ClientTimeout(total=None, connect=CONNECT_TIMEOUT, sock_read=5)
+
+# Attempts for idempotent reads, with jittered exponential back-off between them
+POLL_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+
+ACTION_CONNECT = "connect"
+ACTION_DISCONNECT = "disconnect"
+ACTION_VOLUME = "volume"
+BATCH_ACTIONS = (ACTION_CONNECT, ACTION_DISCONNECT, ACTION_VOLUME)
+
+
+class TuneBladeError(Exception):
+    """Base error for TuneBlade hub requests."""
+
+
+class TuneBladeConnectionError(TuneBladeError):
+    """The hub could not be reached or returned an error."""
+
+
+class TuneBladeCircuitOpenError(TuneBladeError):
+    """The hub failed repeatedly and requests are failing fast."""
+
 
 class TuneBladeApiClient:
-    def __init__(self, host: str, port: int, session: ClientSession):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        session: ClientSession | None = None,
+        poll_timeout: ClientTimeout = POLL_TIMEOUT,
+        command_timeout: ClientTimeout = COMMAND_TIMEOUT,
+        poll_attempts: int = POLL_ATTEMPTS,
+    ):
+        """Create a client; without a session it owns a small keep-alive pool for the hub."""
         self._base_url = f"http://{host}:{port}/v2"
         self._session = session
+        self._owns_session = session is None
+        self._poll_timeout = poll_timeout
+        self._command_timeout = command_timeout
+        self._poll_attempts = poll_attempts
+        self._command_queues: dict[str, DeviceCommandQueue] = {}
+        # Requests allowed on the pool at once; commands go before (and pre-empt) polls
+        self.lanes = RequestLanes(POOL_SIZE)
+        self._parser = StatusParser()
+        self.stats = HubStats()
+        self.breaker = CircuitBreaker()
+        # None until probed; False when the hub has no GET /v2/{id} endpoint
+        self._device_endpoint: bool | None = None
+        self._shared_fetch: asyncio.Future | None = None
+        self.ramps = VolumeRampEngine(self._set_ramp_volume)
+        # Digest of the /v2 body behind the last returned snapshot, so
+        # identical bodies skip parsing and callers can tell snapshots apart
+        self.digest: bytes | None = None
+        self._last_devices: dict[str, TuneBladeDevice] | None = None
+        # ETag / Last-Modified of the last /v2 body, if the hub sends them
+        self._validators: dict[str, str] = {}
+        # Set to record every response and command to a trace file
+        self.recorder: TraceRecorder | None = None
 
     def _get_auth(self):
         return None  # Add auth if needed
 
-    async def async_get_data(self):
-        """Fetch all devices (including master) with connection and volume status."""
-        try:
-            async with self._session.get(self._base_url, auth=self._get_auth()) as resp:
-                resp.raise_for_status()
-                raw_text = await resp.text()
+    def _get_session(self) -> ClientSession:
+        """Return the session, creating the per-hub pool on first use."""
+        if self._session is None or (self._owns_session and self._session.closed):
+            connector = TCPConnector(
+                limit=POOL_SIZE,
+                limit_per_host=POOL_SIZE,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = ClientSession(connector=connector)
+        return self._session
 
-            _LOGGER.debug("Raw TuneBlade response: %s", repr(raw_text))
+    async def async_close(self):
+        """Cancel queued commands, finish any recording and close the hub's connection pool."""
+        self.cancel_commands()
+        if self.recorder is not None:
+            recorder, self.recorder = self.recorder, None
+            await recorder.async_close()
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
 
-            devices = {}
-            for line in raw_text.strip().splitlines():
-                parts = line.split()
-                if len(parts) < 3:
-                    continue
+    async def async_get_data(self) -> dict[str, TuneBladeDevice]:
+        """Fetch all devices (including master) with connection and volume status.
 
-                device_id = parts[0]
-                connected_flag = parts[1]
-                volume_str = parts[2]
-                name = " ".join(parts[3:]) if len(parts) > 3 else device_id
+        Retries with jittered back-off and raises TuneBladeError if the hub
+        cannot be read, or TuneBladeCircuitOpenError while it is failing fast.
+        """
+        headers = None
+        if self._validators and self._last_devices is not None:
+            headers = {}
+            if hdrs.ETAG in self._validators:
+                headers[hdrs.IF_NONE_MATCH] = self._validators[hdrs.ETAG]
+            if hdrs.LAST_MODIFIED in self._validators:
+                headers[hdrs.IF_MODIFIED_SINCE] = self._validators[hdrs.LAST_MODIFIED]
 
-                try:
-                    connected = int(connected_flag) != 0
-                except ValueError:
-                    connected = False
+        with self.stats.span("fetch"):
+            raw, self._validators = await self._async_read(
+                self._base_url, "fetch TuneBlade device data", headers
+            )
+        if raw is None:
+            # 304 Not Modified
+            return self._unchanged()
 
-                try:
-                    volume = int(volume_str)
-                except ValueError:
-                    volume = None
+        self.stats.body_size.add(len(raw))
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if digest == self.digest and self._last_devices is not None:
+            return self._unchanged()
 
-                devices[device_id] = {
-                    "id": device_id,
-                    "name": name.strip(),
-                    "connected": connected,
-                    "volume": volume,
-                    "status_code": connected_flag,
-                }
+        fetched = time.perf_counter()
+        _LOGGER.debug("Raw TuneBlade response: %r", raw)
+        with self.stats.span("parse"):
+            devices = self._parser.parse(raw)
+        self.stats.parse_time.add((time.perf_counter() - fetched) * 1000)
+        self.stats.poll_cache_misses += 1
+        self.digest = digest
+        self._last_devices = devices
+        return devices
 
-            return devices
+    def _unchanged(self) -> dict[str, TuneBladeDevice]:
+        self.stats.poll_cache_hits += 1
+        return self._last_devices
 
-        except Exception as err:
-            _LOGGER.error("Failed to fetch TuneBlade device data: %s", err)
-            return {}
+    async def async_get_data_shared(self) -> dict[str, TuneBladeDevice]:
+        """Fetch all devices, sharing one in-flight request between concurrent callers."""
+        if self._shared_fetch is None:
+            self._shared_fetch = asyncio.ensure_future(self.async_get_data())
+            self._shared_fetch.add_done_callback(self._clear_shared_fetch)
+        return await asyncio.shield(self._shared_fetch)
+
+    def _clear_shared_fetch(self, future: asyncio.Future) -> None:
+        if self._shared_fetch is future:
+            self._shared_fetch = None
+        if not future.cancelled():
+            # Mark the error as retrieved; every waiter already received it
+            future.exception()
+
+    async def async_get_device(self, device_id: str) -> TuneBladeDevice | None:
+        """Fetch the status of one device.
+
+        Uses ``GET /v2/{id}`` when the hub supports it. Otherwise falls back to
+        a full status fetch shared by every concurrent caller.
+        """
+        if self._device_endpoint is not False:
+            try:
+                raw, _ = await self._async_read(
+                    f"{self._base_url}/{device_id}", f"fetch status of {device_id}"
+                )
+            except (TuneBladeCircuitOpenError, TuneBladeConnectionError):
+                raise
+            except TuneBladeError as err:
+                if self._device_endpoint is None:
+                    _LOGGER.debug("Hub has no per-device status endpoint (%s), using full fetches", err)
+                    self._device_endpoint = False
+                else:
+                    # Endpoint works, e.g. the device was just removed: full fetch this once
+                    _LOGGER.debug("Per-device status of %s failed (%s), using a full fetch", device_id, err)
+            else:
+                device = parse_line(raw.strip().split(b"\n", 1)[0])
+                if device is not None and device.id == device_id:
+                    self._device_endpoint = True
+                    return device
+                if self._device_endpoint is None:
+                    _LOGGER.debug("Unexpected per-device status response %r, using full fetches", raw)
+                    self._device_endpoint = False
+
+        devices = await self.async_get_data_shared()
+        return devices.get(device_id)
+
+    async def _async_read(
+        self, url: str, description: str, headers: dict[str, str] | None = None
+    ) -> tuple[bytes | None, dict[str, str]]:
+        """GET an idempotent resource with jittered retries behind the circuit breaker.
+
+        Returns the body (None for 304 Not Modified) and any ETag/Last-Modified.
+
+        Raises TuneBladeCircuitOpenError while failing fast, TuneBladeError if
+        the hub rejected the request and TuneBladeConnectionError otherwise.
+        """
+        for attempt in range(self._poll_attempts):
+            if not self.breaker.allow():
+                raise TuneBladeCircuitOpenError(
+                    f"TuneBlade hub unavailable, retrying in {self.breaker.retry_in:.0f}s"
+                )
+            try:
+                result = await self._fetch(url, headers)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except ClientResponseError as err:
+                if err.status < 500:
+                    # The hub answered, so it is up; the request itself was rejected
+                    self.breaker.record_success()
+                    raise TuneBladeError(f"HTTP error during {description}: {err.status}") from err
+                failure = err
+            except Exception as err:
+                failure = err
+            else:
+                self.breaker.record_success()
+                return result
+
+            if attempt + 1 < self._poll_attempts:
+                self.breaker.release()
+                delay = RETRY_BASE_DELAY * 2**attempt * random.uniform(0.5, 1.5)
+                _LOGGER.debug("Failed to %s (%s), retrying in %.2fs", description, failure, delay)
+                await asyncio.sleep(delay)
+        self.breaker.record_failure()
+        raise TuneBladeConnectionError(f"Failed to {description}: {failure}") from failure
+
+    async def _fetch(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> tuple[bytes | None, dict[str, str]]:
+        """GET in the poll lane, starting over if a command pre-empts the request."""
+        preemptions = 0
+        while True:
+            slot = await self.lanes.acquire(PRIORITY_POLL, preemptions)
+            try:
+                return await self._get(url, headers)
+            except asyncio.CancelledError:
+                # Retry only if the pre-emption was the sole cancellation
+                if not slot.preempted or asyncio.current_task().uncancel() > 0:
+                    raise
+                preemptions += 1
+                self.stats.polls_preempted += 1
+                _LOGGER.debug("Poll of %s pre-empted by a command, retrying", url)
+            finally:
+                self.lanes.release(slot)
+
+    async def _get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> tuple[bytes | None, dict[str, str]]:
+        start = time.perf_counter()
+        async with self._get_session().get(
+            url, auth=self._get_auth(), headers=headers, timeout=self._poll_timeout
+        ) as resp:
+            resp.raise_for_status()
+            raw = None if resp.status == 304 else await resp.read()
+            validators = {
+                name: resp.headers[name]
+                for name in (hdrs.ETAG, hdrs.LAST_MODIFIED)
+                if name in resp.headers
+            }
+        self.stats.poll_rtt.add((time.perf_counter() - start) * 1000)
+        if self.recorder is not None:
+            self.recorder.record(
+                RECORD_NOT_MODIFIED if raw is None else RECORD_RESPONSE, url[len(self._base_url):], raw or b""
+            )
+        return raw, validators
 
     async def connect(self, device_id: str):
         url = f"{self._base_url}/{device_id}/Status/Connect"
-        await self._send_command(url, f"connect {device_id}")
+        await self._queue_command(device_id, KIND_STATUS, url, f"connect {device_id}")
 
     async def disconnect(self, device_id: str):
         url = f"{self._base_url}/{device_id}/Status/Disconnect"
-        await self._send_command(url, f"disconnect {device_id}")
+        await self._queue_command(device_id, KIND_STATUS, url, f"disconnect {device_id}")
 
     async def set_volume(self, device_id: str, volume: int):
+        # A manual change takes over from any running fade
+        self.ramps.cancel(device_id)
+        await self._set_ramp_volume(device_id, volume)
+
+    async def _set_ramp_volume(self, device_id: str, volume: int):
         url = f"{self._base_url}/{device_id}/Volume/{volume}"
-        await self._send_command(url, f"set volume {volume} for {device_id}")
+        await self._queue_command(device_id, KIND_VOLUME, url, f"set volume {volume} for {device_id}")
+
+    async def async_run_commands(
+        self,
+        commands: list[tuple[str, str, int | None]],
+        max_concurrency: int = BATCH_CONCURRENCY,
+    ) -> dict[str, str | None]:
+        """Run (device_id, action, volume) commands, devices concurrently.
+
+        A device's commands run in the given order while holding one of
+        ``max_concurrency`` slots. Returns a mapping of device ID to None on
+        success or the message of its first failed command.
+        """
+        by_device: dict[str, list[tuple[str, int | None]]] = {}
+        for device_id, action, volume in commands:
+            if action not in BATCH_ACTIONS:
+                raise ValueError(f"Unknown batch action: {action}")
+            if action == ACTION_VOLUME and volume is None:
+                raise ValueError("A volume is required for the volume action")
+            by_device.setdefault(device_id, []).append((action, volume))
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _run(device_id: str):
+            async with semaphore:
+                for action, volume in by_device[device_id]:
+                    if action == ACTION_CONNECT:
+                        await self.connect(device_id)
+                    elif action == ACTION_DISCONNECT:
+                        await self.disconnect(device_id)
+                    else:
+                        await self.set_volume(device_id, volume)
+
+        outcomes = await asyncio.gather(
+            *(_run(device_id) for device_id in by_device), return_exceptions=True
+        )
+        return {
+            device_id: None if outcome is None else str(outcome) or type(outcome).__name__
+            for device_id, outcome in zip(by_device, outcomes)
+        }
+
+    async def _queue_command(self, device_id: str, kind: str, url: str, description: str):
+        """Queue a command on the device's queue, coalescing with pending ones."""
+        queue = self._command_queues.get(device_id)
+        if queue is None:
+            queue = self._command_queues[device_id] = DeviceCommandQueue(
+                self._send_command, COMMAND_INTERVAL
+            )
+        start = time.perf_counter()
+        try:
+            await queue.submit(kind, url, description)
+        finally:
+            self.stats.command_latency.add((time.perf_counter() - start) * 1000)
+
+    def commands_pending(self, device_id: str) -> bool:
+        """Return True while commands for the device are queued or in flight."""
+        queue = self._command_queues.get(device_id)
+        return queue is not None and not queue.idle
+
+    def forget_device(self, device_id: str) -> None:
+        """Drop the command queue and ramp of a device that left the hub."""
+        self.ramps.cancel(device_id)
+        queue = self._command_queues.pop(device_id, None)
+        if queue is not None:
+            queue.cancel()
+
+    def cancel_commands(self):
+        """Cancel all queued commands and ramps, e.g. when the entry is unloaded."""
+        self.ramps.cancel_all()
+        for queue in self._command_queues.values():
+            queue.cancel()
+        self._command_queues.clear()
 
     async def _send_command(self, url: str, description: str):
+        """Send one command; commands are not retried and fail fast while the circuit is open."""
+        if not self.breaker.allow():
+            raise TuneBladeCircuitOpenError(f"TuneBlade hub unavailable, cannot {description}")
+        queued = time.perf_counter()
+        slot = None
         try:
-            async with self._session.get(url, auth=self._get_auth()) as resp:
+            slot = await self.lanes.acquire(PRIORITY_COMMAND)
+            self.stats.command_wait.add((time.perf_counter() - queued) * 1000)
+            async with self._get_session().get(
+                url, auth=self._get_auth(), timeout=self._command_timeout
+            ) as resp:
                 resp.raise_for_status()
-            _LOGGER.debug("Command succeeded: %s", description)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
         except ClientResponseError as err:
-            _LOGGER.error("HTTP error during %s: %s", description, err)
+            # The hub answered, so it is up; the command itself was rejected
+            self.breaker.record_success()
+            raise TuneBladeError(f"HTTP error during {description}: {err.status}") from err
         except Exception as err:
-            _LOGGER.error("Error during %s: %s", description, err)
+            self.breaker.record_failure()
+            raise TuneBladeConnectionError(f"Error during {description}: {err}") from err
+        finally:
+            if slot is not None:
+                self.lanes.release(slot)
+        self.breaker.record_success()
+        if self.recorder is not None:
+            self.recorder.record(RECORD_COMMAND, url[len(self._base_url):])
+        _LOGGER.debug("Command succeeded: %s", description)
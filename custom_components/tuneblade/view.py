@@ -0,0 +1,50 @@
+"""Per-revision views of a TuneBlade device shared by all of its entities."""
+from __future__ import annotations
+
+from homeassistant.components.media_player.const import MediaPlayerState
+
+from .parser import STATUS_DISCONNECTED, STATUS_PLAYING, STATUS_STANDBY, STATUS_TEXT, TuneBladeDevice
+
+MEDIA_PLAYER_STATES = {
+    STATUS_PLAYING: MediaPlayerState.PLAYING,
+    STATUS_STANDBY: MediaPlayerState.IDLE,
+}
+
+
+class DeviceView:
+    """Entity-facing values derived from one revision of a device record.
+
+    The coordinator hands out one view per device and builds a new one only
+    when the device's revision changes, so entities read precomputed values
+    instead of looking the record up and rebuilding dicts on every access.
+    """
+
+    __slots__ = ("device_id", "revision", "present", "is_on", "state", "volume_level", "attributes")
+
+    def __init__(self, device_id: str, revision: int, device: TuneBladeDevice | None):
+        self.device_id = device_id
+        self.revision = revision
+        self.present = device is not None
+        if device is None:
+            self.is_on = False
+            self.state = MediaPlayerState.OFF
+            self.volume_level = None
+            self.attributes = {
+                "device_name": "MASTER" if device_id == "MASTER" else None,
+                "status_code": STATUS_DISCONNECTED,
+                "status_text": STATUS_TEXT[STATUS_DISCONNECTED],
+                "volume": None,
+            }
+            return
+
+        code = device.status_code
+        volume = device.volume
+        self.is_on = device.connected
+        self.state = MEDIA_PLAYER_STATES.get(code, MediaPlayerState.OFF)
+        self.volume_level = volume / 100 if volume is not None else None
+        self.attributes = {
+            "device_name": device.name,
+            "status_code": code,
+            "status_text": STATUS_TEXT.get(code, "unknown"),
+            "volume": volume,
+        }
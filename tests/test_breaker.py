@@ -0,0 +1,79 @@
+"""Tests for the hub circuit breaker."""
+from custom_components.tuneblade.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    transitions = []
+    breaker.add_listener(transitions.append)
+    return breaker, clock, transitions
+
+
+def test_opens_after_threshold_failures():
+    breaker, _, transitions = _breaker()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in == 30
+    assert transitions == [STATE_OPEN]
+
+
+def test_success_resets_the_failure_count():
+    breaker, _, _ = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_allows_one_trial_that_closes_the_circuit():
+    breaker, clock, transitions = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert transitions == [STATE_OPEN, STATE_HALF_OPEN, STATE_CLOSED]
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker, clock, _ = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.retry_in == 30
+
+
+def test_released_trial_lets_another_through():
+    breaker, clock, _ = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
@@ -0,0 +1,102 @@
+"""Tests for the per-device command queue."""
+import asyncio
+
+import pytest
+
+from custom_components.tuneblade.command_queue import KIND_STATUS, KIND_VOLUME, DeviceCommandQueue
+
+
+def _queue(min_interval=0.0, fail=None):
+    sent = []
+
+    async def send(url, description):
+        sent.append(url)
+        await asyncio.sleep(0.01)
+        if url == fail:
+            raise ValueError(f"failed {url}")
+
+    return DeviceCommandQueue(send, min_interval), sent
+
+
+def test_pending_volume_coalesces_to_latest():
+    """A burst of volume changes sends only the newest."""
+
+    async def run():
+        queue, sent = _queue()
+        results = await asyncio.gather(*(queue.submit(KIND_VOLUME, f"vol/{level}", "") for level in range(5)))
+        assert results == [None] * 5
+        assert sent == ["vol/4"]
+        assert queue.idle
+
+    asyncio.run(run())
+
+
+def test_duplicate_of_in_flight_command_is_dropped():
+    """A command equal to the one on the wire waits on that request."""
+
+    async def run():
+        queue, sent = _queue()
+        first = queue.submit(KIND_STATUS, "connect", "")
+        await asyncio.sleep(0)
+        second = queue.submit(KIND_STATUS, "connect", "")
+        await asyncio.gather(first, second)
+        assert sent == ["connect"]
+
+    asyncio.run(run())
+
+
+def test_kinds_are_queued_separately():
+    """Status and volume commands do not replace each other."""
+
+    async def run():
+        queue, sent = _queue()
+        connect = queue.submit(KIND_STATUS, "connect", "")
+        await asyncio.sleep(0)
+        await asyncio.gather(
+            connect,
+            queue.submit(KIND_VOLUME, "vol/10", ""),
+            queue.submit(KIND_STATUS, "disconnect", ""),
+        )
+        assert sent == ["connect", "vol/10", "disconnect"]
+
+    asyncio.run(run())
+
+
+def test_failure_reaches_every_coalesced_caller():
+    async def run():
+        queue, _ = _queue(fail="vol/2")
+        await queue.submit(KIND_VOLUME, "vol/0", "")
+        waiting = [queue.submit(KIND_VOLUME, f"vol/{level}", "") for level in (1, 2)]
+        for awaitable in waiting:
+            with pytest.raises(ValueError):
+                await awaitable
+
+    asyncio.run(run())
+
+
+def test_requests_are_spaced_by_min_interval():
+    async def run():
+        queue, sent = _queue(min_interval=0.05)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await queue.submit(KIND_STATUS, "connect", "")
+        await queue.submit(KIND_VOLUME, "vol/10", "")
+        assert sent == ["connect", "vol/10"]
+        assert loop.time() - start >= 0.05
+
+    asyncio.run(run())
+
+
+def test_cancel_fails_pending_commands():
+    async def run():
+        queue, sent = _queue()
+        in_flight = queue.submit(KIND_STATUS, "connect", "")
+        await asyncio.sleep(0)
+        pending = queue.submit(KIND_VOLUME, "vol/10", "")
+        queue.cancel()
+        for awaitable in (in_flight, pending):
+            with pytest.raises(asyncio.CancelledError):
+                await awaitable
+        assert sent == ["connect"]
+
+    asyncio.run(run())
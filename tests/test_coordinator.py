@@ -0,0 +1,75 @@
+"""Tests for the TuneBlade coordinator."""
+from custom_components.tuneblade.coordinator import TuneBladeDataUpdateCoordinator
+from custom_components.tuneblade.parser import STATUS_PLAYING, STATUS_STANDBY, TuneBladeDevice
+from custom_components.tuneblade.tuneblade import TuneBladeApiClient
+
+
+def _devices(**volumes):
+    return {
+        device_id: TuneBladeDevice(device_id, device_id, STATUS_PLAYING if volume else STATUS_STANDBY, volume)
+        for device_id, volume in volumes.items()
+    }
+
+
+async def test_updates_reach_only_listeners_of_changed_devices(hass):
+    client = TuneBladeApiClient("127.0.0.1", 54412)
+    snapshots = [_devices(A=10, B=20), _devices(A=10, B=25)]
+    snapshots.append(snapshots[-1])
+
+    async def get_data():
+        return snapshots.pop(0)
+
+    client.async_get_data = get_data
+    coordinator = TuneBladeDataUpdateCoordinator(hass, client, config_entry=None)
+    calls = []
+    removers = [
+        coordinator.async_add_listener(lambda: calls.append("A"), "A"),
+        coordinator.async_add_listener(lambda: calls.append("B"), "B"),
+        # Listeners without a device context hear every change
+        coordinator.async_add_listener(lambda: calls.append(None)),
+    ]
+
+    await coordinator.async_refresh()
+    calls.clear()
+
+    await coordinator.async_refresh()
+    assert sorted(calls, key=str) == ["B", None]
+    assert coordinator.revisions["B"] > coordinator.revisions["A"]
+
+    calls.clear()
+    await coordinator.async_refresh()
+    assert calls == []
+
+    for remove in removers:
+        remove()
+    await coordinator.async_shutdown()
+    await client.async_close()
+
+
+async def test_failure_reaches_every_listener(hass):
+    client = TuneBladeApiClient("127.0.0.1", 54412)
+    snapshots = [_devices(A=10, B=20), {}]
+
+    async def get_data():
+        return snapshots.pop(0)
+
+    client.async_get_data = get_data
+    coordinator = TuneBladeDataUpdateCoordinator(hass, client, config_entry=None)
+    calls = []
+    removers = [
+        coordinator.async_add_listener(lambda: calls.append("A"), "A"),
+        coordinator.async_add_listener(lambda: calls.append("B"), "B"),
+    ]
+
+    await coordinator.async_refresh()
+    calls.clear()
+
+    # An empty response fails the update, which every entity must see
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert sorted(calls) == ["A", "B"]
+
+    for remove in removers:
+        remove()
+    await coordinator.async_shutdown()
+    await client.async_close()
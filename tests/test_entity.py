@@ -0,0 +1,84 @@
+"""Tests for the entity state write limiter."""
+import asyncio
+
+from custom_components.tuneblade.entity import StateWriteLimiter
+from custom_components.tuneblade.stats import HubStats
+
+
+class FakeEntity:
+    def __init__(self, interval):
+        self.state = "playing"
+        self.volume = 10
+        self.interval = interval
+        self.written = []
+        self.stats = HubStats()
+        self.limiter = StateWriteLimiter(self.write, lambda: self.state, lambda: self.interval, self.stats)
+
+    def write(self):
+        self.written.append((self.state, self.volume))
+
+    def change(self, force=False, **changes):
+        self.__dict__.update(changes)
+        self.limiter.async_write(force)
+
+
+def test_attribute_changes_are_coalesced():
+    async def run():
+        entity = FakeEntity(interval=0.05)
+        entity.change(volume=11)
+        entity.change(volume=12)
+        entity.change(volume=13)
+        assert entity.written == [("playing", 11)]
+        assert entity.stats.writes_deferred == 1
+
+        await asyncio.sleep(0.08)
+        assert entity.written == [("playing", 11), ("playing", 13)]
+
+    asyncio.run(run())
+
+
+def test_state_changes_are_written_at_once():
+    async def run():
+        entity = FakeEntity(interval=10)
+        entity.change(volume=11)
+        entity.change(volume=12)
+        entity.change(state="idle")
+        assert entity.written == [("playing", 11), ("idle", 12)]
+        # The deferred attribute write was folded into the state write
+        assert entity.limiter._timer is None
+
+    asyncio.run(run())
+
+
+def test_forced_writes_bypass_the_interval():
+    async def run():
+        entity = FakeEntity(interval=10)
+        entity.change(volume=11)
+        entity.change(force=True, volume=12)
+        assert entity.written == [("playing", 11), ("playing", 12)]
+        assert entity.limiter._timer is None
+
+    asyncio.run(run())
+
+
+def test_zero_interval_writes_every_change():
+    async def run():
+        entity = FakeEntity(interval=0)
+        for volume in (11, 12, 13):
+            entity.change(volume=volume)
+        assert len(entity.written) == 3
+        assert entity.stats.writes_deferred == 0
+
+    asyncio.run(run())
+
+
+def test_cancel_drops_a_deferred_write():
+    async def run():
+        entity = FakeEntity(interval=0.02)
+        entity.change(volume=11)
+        entity.change(volume=12)
+        entity.limiter.async_cancel()
+        await asyncio.sleep(0.04)
+        assert entity.written == [("playing", 11)]
+
+    asyncio.run(run())
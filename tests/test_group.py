@@ -0,0 +1,93 @@
+"""Tests for speaker groups and their aggregates."""
+import asyncio
+
+from homeassistant.exceptions import HomeAssistantError
+import pytest
+
+from custom_components.tuneblade.group import GroupAggregate, SpeakerGroup
+from custom_components.tuneblade.parser import STATUS_DISCONNECTED, STATUS_PLAYING, STATUS_STANDBY, TuneBladeDevice
+
+
+def _device(device_id, status_code, volume):
+    return TuneBladeDevice(device_id, device_id, status_code, volume)
+
+
+def test_counts_and_volume_statistics():
+    aggregate = GroupAggregate()
+    assert aggregate.update("A", _device("A", STATUS_PLAYING, 20))
+    assert aggregate.update("B", _device("B", STATUS_STANDBY, 60))
+    assert aggregate.update("C", _device("C", STATUS_DISCONNECTED, 40))
+
+    assert aggregate.reporting == 3
+    assert aggregate.connected == 2
+    assert aggregate.playing == 1
+    assert aggregate.volume_min == 20
+    assert aggregate.volume_max == 60
+    assert aggregate.volume_mean == 40
+
+
+def test_unchanged_update_reports_no_change():
+    aggregate = GroupAggregate()
+    aggregate.update("A", _device("A", STATUS_PLAYING, 20))
+    assert not aggregate.update("A", _device("A", STATUS_PLAYING, 20))
+
+
+def test_updates_replace_a_members_contribution():
+    aggregate = GroupAggregate()
+    aggregate.update("A", _device("A", STATUS_PLAYING, 20))
+    aggregate.update("B", _device("B", STATUS_PLAYING, 80))
+    aggregate.update("A", _device("A", STATUS_DISCONNECTED, 90))
+
+    assert aggregate.connected == 1
+    assert aggregate.playing == 1
+    assert aggregate.volume_min == 80
+    assert aggregate.volume_max == 90
+    assert aggregate.volume_mean == 85
+
+
+def test_equal_volumes_share_a_histogram_bucket():
+    aggregate = GroupAggregate()
+    aggregate.update("A", _device("A", STATUS_PLAYING, 50))
+    aggregate.update("B", _device("B", STATUS_PLAYING, 50))
+    aggregate.update("A", None)
+    assert aggregate.volume_min == aggregate.volume_max == 50
+    aggregate.update("B", None)
+    assert aggregate.volume_min is None
+    assert aggregate.volume_max is None
+    assert aggregate.volume_mean is None
+    assert aggregate.reporting == 0
+
+
+def test_volumes_are_clamped_and_unknown_volumes_ignored():
+    aggregate = GroupAggregate()
+    aggregate.update("A", _device("A", STATUS_PLAYING, 150))
+    aggregate.update("B", _device("B", STATUS_PLAYING, None))
+    assert aggregate.volume_max == 100
+    assert aggregate.volume_mean == 100
+    assert aggregate.reporting == 2
+
+
+class FakeCoordinator:
+    last_update_success = True
+
+    def __init__(self, results):
+        self.results = results
+        self.batches = []
+
+    async def async_run_batch(self, device_ids, action, volume=None):
+        self.batches.append((device_ids, action, volume))
+        return self.results
+
+
+def test_group_action_raises_for_failed_members():
+    coordinator = FakeCoordinator({"A": None, "B": "timeout"})
+    group = SpeakerGroup(coordinator, "g1", "Downstairs", ["A", "B"])
+    with pytest.raises(HomeAssistantError, match="B"):
+        asyncio.run(group.async_set_volume(30))
+    assert coordinator.batches == [(["A", "B"], "volume", 30)]
+
+
+def test_group_action_succeeds_when_every_member_does():
+    coordinator = FakeCoordinator({"A": None, "B": None})
+    group = SpeakerGroup(coordinator, "g1", "Downstairs", ["A", "B"])
+    asyncio.run(group.async_turn_on())
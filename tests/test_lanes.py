@@ -0,0 +1,29 @@
+"""Tests for the hub request lanes."""
+import asyncio
+
+from custom_components.tuneblade.lanes import PRIORITY_COMMAND, PRIORITY_POLL, RequestLanes
+
+
+def test_poll_preempted_before_resuming_queues_again():
+    """A poll granted a slot but pre-empted before it resumed retries instead of failing."""
+
+    async def run():
+        lanes = RequestLanes(1)
+        first = await lanes.acquire(PRIORITY_COMMAND)
+        poll = asyncio.create_task(lanes.acquire(PRIORITY_POLL))
+        await asyncio.sleep(0)
+
+        # Hand the slot to the waiting poll and, in the same step, queue a command
+        lanes.release(first)
+        command = await lanes.acquire(PRIORITY_COMMAND)
+        assert not poll.done()
+        lanes.release(command)
+
+        slot = await poll
+        assert slot.preemptions == 1
+        assert not slot.preempted
+        lanes.release(slot)
+        assert lanes.active == 0
+        assert lanes.waiting == 0
+
+    asyncio.run(run())
@@ -0,0 +1,113 @@
+"""Tests for the TuneBlade API client."""
+import asyncio
+
+import pytest
+
+from custom_components.tuneblade.lanes import PRIORITY_COMMAND, RequestLanes
+from custom_components.tuneblade.parser import TuneBladeDevice
+from custom_components.tuneblade.tuneblade import TuneBladeApiClient, TuneBladeError
+
+URL = "http://127.0.0.1:54412/v2"
+
+
+def _client_with_slow_get():
+    client = TuneBladeApiClient("127.0.0.1", 54412)
+    client.lanes = RequestLanes(1)
+    calls = []
+
+    async def _get(url, headers=None):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return b"", {}
+
+    client._get = _get
+    return client, calls
+
+
+def test_preempted_poll_retries():
+    """A poll pre-empted by a command runs again after it."""
+
+    async def run():
+        client, calls = _client_with_slow_get()
+        poll = asyncio.create_task(client._fetch(URL))
+        await asyncio.sleep(0)
+
+        command = await client.lanes.acquire(PRIORITY_COMMAND)
+        client.lanes.release(command)
+
+        assert await poll == (b"", {})
+        assert len(calls) == 2
+        assert client.stats.polls_preempted == 1
+        assert client.lanes.active == 0
+
+    asyncio.run(run())
+
+
+def test_cancel_during_preemption_is_not_swallowed():
+    """A poll cancelled while a command pre-empts it stays cancelled."""
+
+    async def run():
+        client, calls = _client_with_slow_get()
+        poll = asyncio.create_task(client._fetch(URL))
+        await asyncio.sleep(0)
+
+        command = asyncio.create_task(client.lanes.acquire(PRIORITY_COMMAND))
+        await asyncio.sleep(0)
+        # E.g. the entry unloading while the command pre-empts the poll
+        poll.cancel()
+        client.lanes.release(await command)
+
+        with pytest.raises(asyncio.CancelledError):
+            await poll
+        assert len(calls) == 1
+        assert client.lanes.active == 0
+        assert client.lanes.waiting == 0
+
+    asyncio.run(run())
+
+
+def _client_with_device_endpoint(responses):
+    """Client whose per-device reads answer from `responses` and full fetches count themselves."""
+    client = TuneBladeApiClient("127.0.0.1", 54412)
+    full_fetches = []
+
+    async def _async_read(url, description, headers=None):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response, {}
+
+    async def _get_data_shared():
+        full_fetches.append(True)
+        return {"AAA": TuneBladeDevice("AAA", "Kitchen", 100, 30)}
+
+    client._async_read = _async_read
+    client.async_get_data_shared = _get_data_shared
+    return client, full_fetches
+
+
+def test_device_endpoint_error_before_probe_disables_it():
+    """A hub that fails the first per-device read gets full fetches from then on."""
+
+    async def run():
+        client, full_fetches = _client_with_device_endpoint([TuneBladeError("404")])
+        assert (await client.async_get_device("AAA")).volume == 30
+        assert (await client.async_get_device("AAA")).volume == 30
+        assert len(full_fetches) == 2
+
+    asyncio.run(run())
+
+
+def test_device_endpoint_error_after_probe_keeps_it():
+    """One failing device does not turn off per-device reads for the hub."""
+
+    async def run():
+        client, full_fetches = _client_with_device_endpoint(
+            [b"AAA 100 25 Kitchen", TuneBladeError("404"), b"AAA 100 20 Kitchen"]
+        )
+        assert (await client.async_get_device("AAA")).volume == 25
+        assert await client.async_get_device("BBB") is None
+        assert (await client.async_get_device("AAA")).volume == 20
+        assert len(full_fetches) == 1
+
+    asyncio.run(run())